@@ -34,3 +34,20 @@ class EDIBackendCheckComponentMixin(AbstractComponent):
 
     def check(self):
         raise NotImplementedError()
+
+    def check_many(self, exchange_records):
+        """Check the state of many records at once.
+
+        Override to query the remote status of all the records in one go.
+        By default, check each record on its own.
+
+        The component is not bound to any record here:
+        `exchange_record` is empty and `record` is None,
+        only given `exchange_records` must be used.
+
+        :return: dict of check results by record ID
+        """
+        return {
+            rec.id: self.backend._exchange_output_check_state(rec)
+            for rec in exchange_records
+        }
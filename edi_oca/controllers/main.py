@@ -0,0 +1,28 @@
+# Copyright 2026 Camptocamp SA
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import hmac
+
+from werkzeug.exceptions import NotFound
+
+from odoo import http
+from odoo.http import request
+
+
+class EDIMetricsController(http.Controller):
+    @http.route("/edi/metrics", type="http", auth="none", methods=["GET"], csrf=False)
+    def metrics(self):
+        """Expose EDI actions metrics in Prometheus text format.
+
+        Scrapers must send the system parameter `edi_oca.metrics_token`
+        as bearer token. The endpoint is disabled when the parameter is not set.
+        """
+        env = request.env(su=True)
+        token = env["ir.config_parameter"].get_param("edi_oca.metrics_token")
+        auth = request.httprequest.headers.get("Authorization", "")
+        if not token or not hmac.compare_digest(auth, f"Bearer {token}"):
+            raise NotFound()
+        return request.make_response(
+            env["edi.backend.metric"]._prometheus_text(),
+            headers=[("Content-Type", "text/plain; version=0.0.4; charset=utf-8")],
+        )
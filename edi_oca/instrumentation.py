@@ -0,0 +1,89 @@
+# Copyright 2026 Camptocamp SA
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+"""Optional timing of EDI actions.
+
+Enable it w/ `edi_oca_instrumentation = True` in the server configuration.
+Wall time, CPU time and queries count of each action phase are collected
+in memory by each worker and periodically flushed to `edi.backend.metric`.
+When disabled, measuring costs a flag check.
+"""
+
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+from odoo.tools import config, str2bool
+
+enabled = str2bool(config.get("edi_oca_instrumentation") or "0")
+
+# Upper bounds (seconds) of the wall time histogram buckets, +Inf excluded
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds between flushes of a worker's measures
+FLUSH_INTERVAL = 60
+
+NOOP = nullcontext()
+
+
+class PhaseStats:
+    __slots__ = ("count", "wall_time", "cpu_time", "queries", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.queries = 0
+        # Last bucket is +Inf
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def add(self, wall_time, cpu_time, queries):
+        self.count += 1
+        self.wall_time += wall_time
+        self.cpu_time += cpu_time
+        self.queries += queries
+        self.buckets[bisect.bisect_left(BUCKETS, wall_time)] += 1
+
+
+class Recorder:
+    """Measures of current worker by (backend type, exchange type, action, phase)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(PhaseStats)
+        self._last_flush = time.monotonic()
+
+    def add(self, key, wall_time, cpu_time, queries):
+        with self._lock:
+            self._stats[key].add(wall_time, cpu_time, queries)
+
+    def flush_due(self):
+        return time.monotonic() - self._last_flush > FLUSH_INTERVAL
+
+    def pop(self):
+        """Return collected measures and start over."""
+        with self._lock:
+            stats, self._stats = self._stats, defaultdict(PhaseStats)
+            self._last_flush = time.monotonic()
+        return stats
+
+
+recorder = Recorder()
+
+
+@contextmanager
+def measure(cr, key):
+    """Measure the wrapped block and record it under given key."""
+    queries = cr.sql_log_count
+    wall_time = time.perf_counter()
+    cpu_time = time.thread_time()
+    try:
+        yield
+    finally:
+        recorder.add(
+            key,
+            time.perf_counter() - wall_time,
+            time.thread_time() - cpu_time,
+            cr.sql_log_count - queries,
+        )
@@ -0,0 +1,26 @@
+# Copyright 2026 Camptocamp SA
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    # Link existing jobs to the exchange records they run on or receive
+    cr.execute(
+        """
+        INSERT INTO edi_exchange_record_queue_job_rel (exchange_record_id, job_id)
+        SELECT DISTINCT rec.id, job.id
+        FROM queue_job job
+        CROSS JOIN LATERAL (
+            SELECT jsonb_array_elements(job.records::jsonb -> 'ids') AS id
+            WHERE job.model_name = 'edi.exchange.record'
+            UNION ALL
+            SELECT jsonb_path_query(
+                job.args::jsonb,
+                '$[*] ? (@.model == "edi.exchange.record").ids[*]'
+            )
+        ) job_rec
+        JOIN edi_exchange_record rec ON rec.id = job_rec.id::text::integer
+        ON CONFLICT DO NOTHING
+        """
+    )
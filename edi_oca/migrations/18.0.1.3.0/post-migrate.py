@@ -0,0 +1,53 @@
+# Copyright 2026 Camptocamp SA
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+from odoo import SUPERUSER_ID, api
+
+from odoo.addons.edi_oca.utils import exchange_record_job_identity_exact
+from odoo.addons.queue_job.job import ENQUEUED, PENDING, WAIT_DEPENDENCIES, Job
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    # Checksums are now the ones of the file attachments (SHA1 of raw content)
+    cr.execute(
+        """
+        UPDATE edi_exchange_record rec
+        SET exchange_filechecksum = att.checksum
+        FROM ir_attachment att
+        WHERE att.res_model = 'edi.exchange.record'
+        AND att.res_field = 'exchange_file'
+        AND att.res_id = rec.id
+        """
+    )
+    cr.execute(
+        """
+        UPDATE edi_exchange_record
+        SET exchange_filechecksum = NULL
+        WHERE has_file IS NOT TRUE
+        """
+    )
+    # Checksums are part of the identity of jobs on exchange records:
+    # recompute it for jobs to run, or they would no longer be deduplicated
+    cr.execute(
+        """
+        SELECT uuid FROM queue_job
+        WHERE model_name = 'edi.exchange.record'
+        AND identity_key IS NOT NULL
+        AND state IN %s
+        """,
+        ((WAIT_DEPENDENCIES, PENDING, ENQUEUED),),
+    )
+    uuids = [row[0] for row in cr.fetchall()]
+    if not uuids:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    for job in Job.load_many(env, uuids):
+        if job.recordset.exists() != job.recordset:
+            # Records deleted meanwhile: the job would fail anyway
+            continue
+        cr.execute(
+            "UPDATE queue_job SET identity_key = %s WHERE uuid = %s",
+            (exchange_record_job_identity_exact(job), job.uuid),
+        )
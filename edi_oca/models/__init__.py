@@ -1,7 +1,15 @@
 from . import edi_backend
+from . import edi_backend_metric
+from . import edi_backend_sync_request
 from . import edi_backend_type
 from . import edi_exchange_record
+from . import edi_exchange_record_transition
 from . import edi_exchange_consumer_mixin
+from . import edi_exchange_error
 from . import edi_exchange_type
 from . import edi_exchange_type_rule
 from . import edi_id_mixin
+from . import ir_model_access
+from . import ir_rule
+from . import queue_job
+from . import res_users
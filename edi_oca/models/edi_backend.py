@@ -5,16 +5,26 @@
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 
 
-import base64
 import logging
+import threading
+import time
 import traceback
+import weakref
+from collections import namedtuple
+from datetime import timedelta
 from io import StringIO
 
-from odoo import _, exceptions, fields, models
+from odoo import _, exceptions, fields, models, tools
+from odoo.osv import expression
+from odoo.tools import config, groupby
+from odoo.tools.misc import frozendict
 
 from odoo.addons.component.exception import NoComponentError
 from odoo.addons.queue_job.exception import RetryableJobError
+from odoo.addons.queue_job.job import identity_exact
+from odoo.addons.queue_job.utils import must_run_without_delay
 
+from .. import instrumentation
 from ..exceptions import EDIValidationError
 
 _logger = logging.getLogger(__name__)
@@ -28,6 +38,16 @@ def _get_exception_msg():
     return traceback_txt
 
 
+# Component classes resolved by `_find_component`, per components registry.
+# The registry is replaced when it gets rebuilt, which drops its lookups too.
+_component_class_cache = weakref.WeakKeyDictionary()
+
+# Everything needed to lookup and set up the component for an action.
+EDIActionPlan = namedtuple(
+    "EDIActionPlan", "usage_candidates env_ctx work_ctx match_attrs"
+)
+
+
 class EDIBackend(models.Model):
     """Generic backend to control EDI exchanges.
 
@@ -59,31 +79,150 @@ class EDIBackend(models.Model):
     )
     active = fields.Boolean(default=True)
     company_id = fields.Many2one("res.company", string="Company")
+    sync_chunk_size = fields.Integer(
+        default=1000,
+        help="Maximum number of records handled at once by sync crons. "
+        "Crons commit after each chunk and resume from the last handled record "
+        "on their next run. Set 0 to handle all records at once.",
+    )
+    output_sync_cursor = fields.Integer(
+        readonly=True,
+        copy=False,
+        help="Last record handled by the output sync cron.",
+    )
+    input_sync_cursor = fields.Integer(
+        readonly=True,
+        copy=False,
+        help="Last record handled by the input sync cron.",
+    )
+    output_pending_sync_cursor = fields.Integer(
+        readonly=True,
+        copy=False,
+        help="Last record handled by the output sync of changed records.",
+    )
+    input_pending_sync_cursor = fields.Integer(
+        readonly=True,
+        copy=False,
+        help="Last record handled by the input sync of changed records.",
+    )
+    log_transitions = fields.Boolean(
+        help="Log state transitions of exchange records "
+        "to measure how long each stage takes.",
+    )
+    check_batch_size = fields.Integer(
+        default=100,
+        help="Maximum number of sent records checked by a single job.",
+    )
+    check_job_channel_id = fields.Many2one(
+        comodel_name="queue.job.channel",
+        help="Channel of the jobs checking sent records. "
+        "Use a channel per backend to control how many checks run in parallel.",
+    )
+    sync_trigger_delay = fields.Integer(
+        default=10,
+        help="Delay in seconds to run the sync crons after records changed. "
+        "Changes happening meanwhile are handled by the same sync. "
+        "Set 0 to rely on scheduled runs only.",
+    )
 
-    def _get_component(self, exchange_record, key):
-        record_conf = self._get_component_conf_for_record(exchange_record, key)
+    # Max duration in seconds of a sync cron run before re-triggering it
+    _sync_cron_time_budget = 300
+    # Share of the workers time limit a sync run can use,
+    # leaving time to finish the current chunk before being killed
+    _sync_time_limit_ratio = 0.5
+
+    def _get_component(self, exchange_record, key, bound=True):
+        with self._measure(exchange_record, key, "lookup"):
+            return self._lookup_component(exchange_record, key, bound=bound)
+
+    def _lookup_component(self, exchange_record, key, bound=True):
+        """Find the component handling given action for given record.
+
+        :param bound: when False, the component is only looked up
+            w/ given record: its `exchange_record` is empty.
+            Used for components handling many records at once (eg: `check_many`).
+        """
+        plan = self._get_action_plan(exchange_record, key)
         # Load additional ctx keys if any
-        collection = self
-        # TODO: document/test this
-        env_ctx = self._get_component_env_ctx(record_conf, key)
-        collection = collection.with_context(**env_ctx)
-        exchange_record = exchange_record.with_context(**env_ctx)
-        work_ctx = {"exchange_record": exchange_record}
-        # Inject work context from advanced settings
-        work_ctx.update(record_conf.get("work_ctx", {}))
+        collection = self.with_context(**plan.env_ctx)
         # Model is not granted to be there
         model = exchange_record.model or self._name
-        candidates = self._get_component_usage_candidates(exchange_record, key)
-        match_attrs = self._component_match_attrs(exchange_record, key)
+        if not bound:
+            exchange_record = exchange_record.browse()
+        exchange_record = exchange_record.with_context(**plan.env_ctx)
+        work_ctx = {"exchange_record": exchange_record}
+        # Inject work context from advanced settings
+        work_ctx.update(plan.work_ctx)
         return collection._find_component(
             model,
-            candidates,
+            list(plan.usage_candidates),
             work_ctx=work_ctx,
-            **match_attrs,
+            **plan.match_attrs,
+        )
+
+    def _measure(self, exchange_record, action, phase):
+        """Measure a phase of given action when instrumentation is enabled."""
+        if not instrumentation.enabled:
+            return instrumentation.NOOP
+        key = (self.backend_type_id.code, exchange_record.type_id.code, action, phase)
+        return instrumentation.measure(self.env.cr, key)
+
+    def _flush_metrics(self):
+        if not instrumentation.enabled or not instrumentation.recorder.flush_due():
+            return
+        stats = instrumentation.recorder.pop()
+        # Own transaction: measures must not be lost if the action is rolled back
+        with self.env.registry.cursor() as cr:
+            self.env(cr=cr, su=True)["edi.backend.metric"]._store(stats)
+
+    def _get_action_plan(self, exchange_record, key):
+        """Retrieve the plan to run given action on records of the same type.
+
+        Usage candidates, contexts and match attributes only depend
+        on the backend, the exchange type and the action:
+        they are computed once and cached for a given `_get_action_plan_key`.
+        """
+        cache_key = self._get_action_plan_key(exchange_record, key)
+        if cache_key is None:
+            return self._make_action_plan(exchange_record, key)
+        return self._get_cached_action_plan(exchange_record, key, cache_key)
+
+    def _get_action_plan_key(self, exchange_record, key):
+        """Return the values action plans depend on.
+
+        Overrides of the methods used to make plans relying on other values
+        must add them here, or return None to disable caching.
+        """
+        exc_type = exchange_record.type_id
+        return (
+            self.id,
+            self.backend_type_id.code,
+            exc_type.id,
+            exc_type.code,
+            exc_type.direction,
+            exc_type.advanced_settings_edit,
+            key,
+        )
+
+    @tools.ormcache("cache_key")
+    def _get_cached_action_plan(self, exchange_record, key, cache_key):
+        return self._make_action_plan(exchange_record, key)
+
+    def _make_action_plan(self, exchange_record, key):
+        record_conf = self._get_component_conf_for_record(exchange_record, key)
+        # TODO: document/test this
+        env_ctx = self._get_component_env_ctx(record_conf, key)
+        return EDIActionPlan(
+            usage_candidates=tuple(
+                self._get_component_usage_candidates(exchange_record, key)
+            ),
+            env_ctx=frozendict(env_ctx),
+            work_ctx=frozendict(record_conf.get("work_ctx", {})),
+            match_attrs=frozendict(self._component_match_attrs(exchange_record, key)),
         )
 
     def _get_component_env_ctx(self, record_conf, key):
-        env_ctx = record_conf.get("env_ctx", {})
+        env_ctx = dict(record_conf.get("env_ctx", {}))
         # You can use `edi_session` down in the stack to control logics.
         env_ctx.update(dict(edi_framework_action=key))
         return env_ctx
@@ -123,25 +262,51 @@ class EDIBackend(models.Model):
         if "backend" not in work_ctx:
             work_ctx["backend"] = self
         with self.work_on(model, **work_ctx) as work:
-            for usage in usage_candidates:
-                components, c_work_ctx = work._matching_components(usage=usage, **kw)
-                if not components:
-                    continue
-                # Sort components and pick the 1st one matching.
-                # In this way we support generic components registration
-                # and specific components registrations
-                components = sorted(
-                    components, key=lambda x: self._component_sort_key(x), reverse=True
-                )
-                component = components[0](c_work_ctx)
+            component_class = self._find_component_class(work, usage_candidates, **kw)
+            if component_class:
+                component = component_class(work)
                 _logger.debug("using component %s", component._name)
-                break
         if not component and not safe:
             raise NoComponentError(
                 f"No component found matching any of: {usage_candidates}"
             )
         return component or None
 
+    def _find_component_class(self, work, usage_candidates, **kw):
+        """Retrieve the component class matching given usage candidates.
+
+        The lookup only depends on the model, the usages and the match attributes
+        hence its result is cached for the components registry in use.
+
+        :param work: work context used for the lookup
+        :param usage_candidates: list of usage to try by priority
+        :param kw: keyword args to lookup for components (eg: exchange_type)
+        """
+        cache = _component_class_cache.setdefault(work.components_registry, {})
+        key = (
+            self._name,
+            work.model_name,
+            tuple(usage_candidates),
+            tuple(sorted(kw.items())),
+        )
+        if key not in cache:
+            cache[key] = self._lookup_component_class(work, usage_candidates, **kw)
+        return cache[key]
+
+    def _lookup_component_class(self, work, usage_candidates, **kw):
+        for usage in usage_candidates:
+            components, __ = work._matching_components(usage=usage, **kw)
+            if not components:
+                continue
+            # Sort components and pick the 1st one matching.
+            # In this way we support generic components registration
+            # and specific components registrations
+            components = sorted(
+                components, key=lambda x: self._component_sort_key(x), reverse=True
+            )
+            return components[0]
+        return None
+
     def _get_component_usage_candidates(self, exchange_record, key):
         """Retrieve usage candidates for components."""
         # fmt:off
@@ -176,15 +341,41 @@ class EDIBackend(models.Model):
         _values = self._create_record_prepare_values(type_code, values)
         return self.exchange_record_model.create(_values)
 
+    def create_records(self, type_code, vals_list):
+        """Create exchange records of the same type for current backend.
+
+        Use it in place of `create_record` to create many records at once:
+        the exchange type is looked up only once
+        and records are created in batch.
+
+        :param type_code: edi.exchange.type code
+        :param vals_list: list of edi.exchange.record values
+        :return: edi.exchange.record recordset
+        """
+        self.ensure_one()
+        exchange_type = self._get_exchange_type(type_code)
+        _vals_list = self._create_records_prepare_values(exchange_type, vals_list)
+        return self.exchange_record_model.create(_vals_list)
+
     def _create_record_prepare_values(self, type_code, values):
-        res = values.copy()  # do not pollute original dict
+        exchange_type = self._get_exchange_type(type_code)
+        return self._create_records_prepare_values(exchange_type, [values])[0]
+
+    def _create_records_prepare_values(self, exchange_type, vals_list):
+        res = []
+        for values in vals_list:
+            vals = values.copy()  # do not pollute original dict
+            vals["type_id"] = exchange_type.id
+            vals["backend_id"] = self.id
+            res.append(vals)
+        return res
+
+    def _get_exchange_type(self, type_code):
         exchange_type = self.env["edi.exchange.type"].search(
             self._get_exchange_type_domain(type_code), limit=1
         )
         assert exchange_type, f"Exchange type not found: {type_code}"
-        res["type_id"] = exchange_type.id
-        res["backend_id"] = self.id
-        return res
+        return exchange_type
 
     def _get_exchange_type_domain(self, code):
         return [
@@ -205,7 +396,7 @@ class EDIBackend(models.Model):
         :param kw: keyword args to be propagated to output generate handler
         """
         self.ensure_one()
-        if force and exchange_record.exchange_file:
+        if force and exchange_record.has_file:
             # Remove file to regenerate
             exchange_record.exchange_file = False
         self._check_exchange_generate(exchange_record, force=force)
@@ -216,14 +407,15 @@ class EDIBackend(models.Model):
             exchange_record.type_id.encoding_out_error_handler or "strict"
         )
         if output and store:
-            if not isinstance(output, bytes):
-                output = output.encode(encoding, errors=encoding_error_handler)
-            exchange_record.update(
-                {
-                    "exchange_file": base64.b64encode(output),
-                    "edi_exchange_state": "output_pending",
-                }
-            )
+            with self._measure(exchange_record, "generate", "encode"):
+                if not isinstance(output, bytes):
+                    output = output.encode(encoding, errors=encoding_error_handler)
+            with self._measure(exchange_record, "generate", "write"):
+                exchange_record._set_file_raw(output)
+                exchange_record.update({"edi_exchange_state": "output_pending"})
+            if not self.env.context.get("job_uuid"):
+                # Generated out of a sync job: nothing will send it right away
+                exchange_record._schedule_sync()
         if output:
             message = exchange_record._exchange_status_message("generate_ok")
             try:
@@ -233,9 +425,11 @@ class EDIBackend(models.Model):
                 state = "validate_error"
                 message = exchange_record._exchange_status_message("validate_ko")
                 exchange_record.update(
-                    {"edi_exchange_state": state, "exchange_error": error}
+                    {"edi_exchange_state": state, **self._get_error_values(error)}
                 )
-        exchange_record.notify_action_complete("generate", message=message)
+        with self._measure(exchange_record, "generate", "notify"):
+            exchange_record.notify_action_complete("generate", message=message)
+        self._flush_metrics()
         return message
 
     # TODO: unify to all other checkes that return something
@@ -243,7 +437,7 @@ class EDIBackend(models.Model):
         exchange_record.ensure_one()
         if (
             exchange_record.edi_exchange_state != "new"
-            and exchange_record.exchange_file
+            and exchange_record.has_file
             and not force
         ):
             raise exceptions.UserError(
@@ -261,7 +455,7 @@ class EDIBackend(models.Model):
                 )
                 % exchange_record.id
             )
-        if exchange_record.exchange_file:
+        if exchange_record.has_file:
             raise exceptions.UserError(
                 _("Exchange record ID=%d already has a file to process!")
                 % exchange_record.id
@@ -270,12 +464,13 @@ class EDIBackend(models.Model):
     def _exchange_generate(self, exchange_record, **kw):
         component = self._get_component(exchange_record, "generate")
         if component:
-            return component.generate()
+            with self._measure(exchange_record, "generate", "call"):
+                return component.generate()
         raise NotImplementedError("No handler for `_exchange_generate`")
 
     # TODO: add tests
     def _validate_data(self, exchange_record, value=None, **kw):
-        if exchange_record.direction == "input" and not exchange_record.exchange_file:
+        if exchange_record.direction == "input" and not exchange_record.has_file:
             if not exchange_record.type_id.allow_empty_files_on_receive:
                 raise ValueError(
                     _(
@@ -290,7 +485,8 @@ class EDIBackend(models.Model):
 
         component = self._get_component(exchange_record, "validate")
         if component:
-            return component.validate(value)
+            with self._measure(exchange_record, "validate", "call"):
+                return component.validate(value)
 
     def exchange_send(self, exchange_record):
         """Send exchange file."""
@@ -304,6 +500,7 @@ class EDIBackend(models.Model):
         error = False
         message = None
         res = ""
+        start = time.perf_counter()
         try:
             self._exchange_send(exchange_record)
             _logger.debug("%s sent", exchange_record.identifier)
@@ -334,18 +531,136 @@ class EDIBackend(models.Model):
             )
             res = message
         finally:
-            exchange_record.write(
-                {
-                    "edi_exchange_state": state,
-                    "exchange_error": error,
-                    # FIXME: this should come from _compute_exchanged_on
-                    # but somehow it's failing in send tests (in record tests it works).
-                    "exchanged_on": fields.Datetime.now(),
-                }
-            )
-        exchange_record.notify_action_complete("send", message=message)
+            action_duration = time.perf_counter() - start
+            with self._measure(exchange_record, "send", "write"):
+                self.exchange_records_transition(
+                    [(exchange_record, state, error)],
+                    action_duration=action_duration,
+                    strict=False,
+                )
+        with self._measure(exchange_record, "send", "notify"):
+            exchange_record.notify_action_complete("send", message=message)
+        self._flush_metrics()
         return res
 
+    # Allowed state transitions of exchange records: from -> to
+    _exchange_state_transitions = {
+        "new": ("output_pending", "validate_error", "input_pending", "input_received"),
+        "validate_error": ("output_pending", "input_pending", "input_received"),
+        "output_pending": (
+            "output_sent",
+            "output_sent_and_processed",
+            "output_error_on_send",
+            "validate_error",
+        ),
+        "output_error_on_send": (
+            "output_pending",
+            "output_sent",
+            "output_sent_and_processed",
+        ),
+        "output_sent": ("output_sent_and_processed", "output_sent_and_error"),
+        "output_sent_and_error": (
+            "output_pending",
+            "output_sent",
+            "output_sent_and_processed",
+        ),
+        "output_sent_and_processed": (),
+        "input_pending": ("input_received", "input_receive_error", "validate_error"),
+        "input_receive_error": ("input_pending", "input_received", "validate_error"),
+        "input_received": ("input_processed", "input_processed_error"),
+        "input_processed_error": ("input_received", "input_processed"),
+        "input_processed": (),
+    }
+
+    def _is_valid_state_transition(self, exchange_record, state):
+        from_state = exchange_record.edi_exchange_state
+        if state == from_state:
+            return True
+        if state not in self._exchange_state_transitions.get(from_state, ()):
+            return False
+        return state in ("new", "validate_error") or state.startswith(
+            exchange_record.direction
+        )
+
+    def exchange_records_transition(
+        self, transitions, exchanged_on=None, action_duration=None, strict=True
+    ):
+        """Move exchange records to new states at once.
+
+        Records sharing the same target state and error are updated together.
+        Records of types w/ `bulk_state_update` bypass `write`.
+        Dependent computed fields are recomputed once for all the records.
+        State changes are logged for backends w/ `log_transitions`.
+
+        :param transitions: list of `(exchange_record, state, error)`
+        :param exchanged_on: exchange date, defaults to now
+        :param action_duration: seconds spent by the action leading to the transitions
+        :param strict: raise on invalid transitions, otherwise only log them.
+            Actions recording their outcome (eg: from a `finally` block)
+            must not hide the actual error nor lose the new state.
+        """
+        invalid = [
+            (rec, state)
+            for rec, state, __ in transitions
+            if not self._is_valid_state_transition(rec, state)
+        ]
+        if invalid:
+            details = "\n".join(
+                f"{rec.identifier}: {rec.edi_exchange_state} -> {state}"
+                for rec, state in invalid
+            )
+            if strict:
+                raise exceptions.UserError(
+                    _("Invalid state transition for exchange records:\n%s", details)
+                )
+            _logger.warning(
+                "Invalid state transition for exchange records:\n%s", details
+            )
+        exchanged_on = exchanged_on or fields.Datetime.now()
+        error_ids = (
+            self.env["edi.exchange.error"]
+            .sudo()
+            ._register([error for __, __, error in transitions if error])
+        )
+        groups = {}
+        for rec, state, error in transitions:
+            key = (state, error or None, rec.type_id.bulk_state_update)
+            groups.setdefault(key, []).append(rec.id)
+        record_model = self.exchange_record_model
+        for (state, error, bulk), record_ids in groups.items():
+            records = record_model.browse(record_ids)
+            # Logged here to keep track of the action duration
+            records._log_state_transition(
+                state, date=exchanged_on, action_duration=action_duration
+            )
+            records = records.with_context(edi_transition_logged=True)
+            vals = {
+                "edi_exchange_state": state,
+                "exchanged_on": exchanged_on,
+                **self._get_error_values(error, error_ids=error_ids),
+            }
+            if bulk:
+                records._write_state_values(vals)
+            else:
+                records.write(vals)
+        record_model.flush_model()
+
+    def _get_error_values(self, error, error_ids=None):
+        """Values of exchange records storing given error.
+
+        Full tracebacks are stored once per fingerprint on `edi.exchange.error`,
+        records only keep the exception message.
+        """
+        if not error:
+            return {"exchange_error": None, "error_id": None}
+        error_model = self.env["edi.exchange.error"].sudo()
+        if error_ids is None:
+            error_ids = error_model._register([error])
+        return {
+            "exchange_error": error_model._get_detail(error),
+            "error_id": error_ids[error],
+        }
+
     def _swallable_exceptions(self):
         # TODO: improve this list
         return (
@@ -366,7 +681,7 @@ class EDIBackend(models.Model):
             raise exceptions.UserError(
                 _("Record ID=%d is not meant to be sent!") % exchange_record.id
             )
-        if not exchange_record.exchange_file:
+        if not exchange_record.has_file:
             raise exceptions.UserError(
                 _("Record ID=%d has no file to send!") % exchange_record.id
             )
@@ -378,15 +693,225 @@ class EDIBackend(models.Model):
     def _exchange_send(self, exchange_record):
         component = self._get_component(exchange_record, "send")
         if component:
-            return component.send()
+            with self._measure(exchange_record, "send", "call"):
+                return component.send()
         raise NotImplementedError("No handler for `_exchange_send`")
 
     def _cron_check_output_exchange_sync(self, **kw):
+        self._cron_check_exchange_sync("output", **kw)
+
+    def _cron_check_exchange_sync(self, direction, **kw):
+        """Run sync of given direction on current backends by chunks.
+
+        Each backend gets its own scan job so that backends are synced
+        in parallel and a slow backend does not delay the others.
+        When jobs cannot be delayed, backends are synced in a row:
+        when the time budget is over the cron gets re-triggered
+        to take care of the remaining records.
+
+        :return: backends taken care of
+        """
+        if not must_run_without_delay(self.env):
+            for backend in self:
+                backend._delay_exchange_sync_job(direction, **kw)
+            return self
+        deadline = time.monotonic() + self._get_sync_time_budget(cron=True)
+        done = self.browse()
         for backend in self:
-            backend._check_output_exchange_sync(**kw)
+            if not backend._check_exchange_sync_chunked(
+                direction, deadline=deadline, **kw
+            ):
+                self._sync_cron_trigger(
+                    direction, pending_only=kw.get("pending_only", False)
+                )
+                break
+            done |= backend
+        return done
+
+    def _cron_check_requested_exchange_sync(self, direction):
+        """Sync backends w/ records changed since their last sync.
+
+        Only records waiting for an action are taken care of,
+        records waiting for a state check are left to the scheduled sync.
+        See `_schedule_sync`.
+        """
+        requests = (
+            self.env["edi.backend.sync.request"]
+            .sudo()
+            .search([("direction", "=", direction)])
+        )
+        backends = requests.backend_id.filtered("active")
+        done = backends._cron_check_exchange_sync(direction, pending_only=True)
+        # Requests inserted meanwhile are not seen yet: they trigger another run
+        requests.filtered(lambda x: x.backend_id not in backends - done).unlink()
+
+    def _delay_exchange_sync_job(self, direction, **kw):
+        # Identity key: do not stack scans of the same backend
+        return self.with_delay(
+            identity_key=identity_exact,
+            description=_(
+                "EDI %(direction)s sync of backend %(name)s",
+                direction=direction,
+                name=self.name,
+            ),
+        )._check_exchange_sync_job(direction, **kw)
+
+    def _check_exchange_sync_job(self, direction, **kw):
+        """Scan current backend for records to sync and enqueue their jobs.
+
+        Jobs cannot commit: chunks handled are committed w/ the job.
+        When the time budget is over another scan job takes care
+        of the remaining records.
+        """
+        self.ensure_one()
+        deadline = time.monotonic() + self._get_sync_time_budget()
+        if not self._check_exchange_sync_chunked(direction, deadline=deadline, **kw):
+            self._delay_exchange_sync_job(direction, **kw)
+            return _("Time is over, sync continues in a new job.")
+        return _("Sync done.")
+
+    def _get_sync_time_budget(self, cron=False):
+        """Seconds a sync run can last before leaving the rest to another run.
+
+        Bounded by the time limit of workers running it (crons or jobs):
+        a killed run would never re-trigger itself.
+        """
+        limit = config.get("limit_time_real", 0)
+        if cron and config.get("limit_time_real_cron", -1) >= 0:
+            limit = config["limit_time_real_cron"]
+        if limit <= 0:  # no limit
+            return self._sync_cron_time_budget
+        return min(self._sync_cron_time_budget, limit * self._sync_time_limit_ratio)
+
+    def _check_exchange_sync_chunked(self, direction, deadline=None, **kw):
+        """Run sync of given direction by chunks, committing after each of them
+        (except in jobs).
+
+        The last handled record is stored on the backend
+        so that an interrupted sync resumes from there.
+
+        :param direction: input or output
+        :param deadline: time (as per `time.monotonic`) to stop at
+        :return: True if all the records have been handled
+        """
+        self.ensure_one()
+        sync = getattr(self, f"_check_{direction}_exchange_sync")
+        chunk_size = self.sync_chunk_size
+        if not chunk_size:
+            sync(**kw)
+            return True
+        if kw.get("pending_only"):
+            cursor_fname = f"{direction}_pending_sync_cursor"
+        else:
+            cursor_fname = f"{direction}_sync_cursor"
+        domain = self._sync_records_domain(direction, **kw)
+        while True:
+            records = self.exchange_record_model.search(
+                domain + [("id", ">", self[cursor_fname])],
+                order="id",
+                limit=chunk_size,
+            )
+            if records:
+                sync(record_ids=records.ids, **kw)
+            done = len(records) < chunk_size
+            cursor = 0 if done else records[-1].id
+            if cursor != self[cursor_fname]:
+                self[cursor_fname] = cursor
+            self._sync_commit()
+            if done:
+                return True
+            if deadline and time.monotonic() > deadline:
+                _logger.info(
+                    "EDI Exchange %s sync: time is over, resuming on next run.",
+                    direction,
+                )
+                return False
+
+    def _sync_records_domain(
+        self, direction, skip_send=False, skip_sent=True, pending_only=False, **kw
+    ):
+        """Domain matching all the records taken care of by the sync."""
+        if direction == "output":
+            domains = [self._output_new_records_domain()]
+            if not skip_send:
+                domains.append(
+                    self._output_pending_records_domain(
+                        skip_sent=skip_sent, pending_only=pending_only
+                    )
+                )
+        else:
+            domains = [
+                self._input_pending_records_domain(),
+                self._input_pending_process_records_domain(),
+            ]
+        return expression.OR(domains)
+
+    def _sync_commit(self):
+        if self.env.context.get("job_uuid"):
+            # Commit is not allowed in jobs, see `_check_exchange_sync_job`
+            return
+        if getattr(threading.current_thread(), "testing", False):
+            # Commit is not allowed in tests
+            return
+        self.env.cr.commit()  # pylint: disable=invalid-commit
+
+    def _get_sync_cron(self, direction, pending_only=False):
+        if pending_only:
+            xmlid = f"edi_oca.cron_edi_backend_check_{direction}_requested_exchange"
+        else:
+            xmlid = f"edi_oca.cron_edi_backend_check_{direction}_exchange"
+        return self.env.ref(xmlid, raise_if_not_found=False)
+
+    def _sync_cron_trigger(self, direction, at=None, pending_only=False):
+        cron = self._get_sync_cron(direction, pending_only=pending_only)
+        if cron:
+            cron._trigger(at=at)
+
+    def _schedule_sync(self, direction):
+        """Mark current backends as needing a sync soon.
+
+        Once the transaction is committed, sync requests are stored
+        and the sync cron of requested backends is triggered.
+        """
+        postcommit = self.env.cr.postcommit
+        if "edi_oca.sync_requests" not in postcommit.data:
+            postcommit.add(self.sudo()._flush_scheduled_sync)
+        requests = postcommit.data.setdefault("edi_oca.sync_requests", {})
+        for backend in self.filtered(lambda x: x.active and x.sync_trigger_delay > 0):
+            requests[(backend.id, direction)] = backend.sync_trigger_delay
+
+    def _flush_scheduled_sync(self):
+        requests = self.env.cr.postcommit.data.pop("edi_oca.sync_requests", {})
+        if not requests:
+            return
+        delays = {}
+        for (__, direction), delay in requests.items():
+            delays[direction] = min(delays.get(direction, delay), delay)
+        # Current transaction is over: store requests in a new one
+        with self.env.registry.cursor() as cr:
+            env = self.env(cr=cr, su=True)
+            env["edi.backend.sync.request"]._add(requests)
+            env["edi.backend"]._trigger_scheduled_sync(delays)
+
+    def _trigger_scheduled_sync(self, delays):
+        now = fields.Datetime.now()
+        for direction, delay in delays.items():
+            at = now + timedelta(seconds=delay)
+            cron = self._get_sync_cron(direction, pending_only=True)
+            # Coalesce w/ a trigger already planned within the delay
+            if not cron or self.env["ir.cron.trigger"].sudo().search_count(
+                [
+                    ("cron_id", "=", cron.id),
+                    ("call_at", ">=", now),
+                    ("call_at", "<=", at),
+                ],
+                limit=1,
+            ):
+                continue
+            cron._trigger(at=at)
 
     def _check_output_exchange_sync(
-        self, skip_send=False, skip_sent=True, record_ids=None
+        self, skip_send=False, skip_sent=True, record_ids=None, pending_only=False
     ):
         """Lookup for pending output records and take care of them.
 
@@ -395,6 +920,7 @@ class EDIBackend(models.Model):
 
         :param skip_send: only generate missing output.
         :param skip_sent: ignore records that were already sent.
+        :param pending_only: ignore records waiting for a state check.
         """
         # Generate output files
         new_records = self._get_new_output_exchange_records(record_ids=record_ids)
@@ -402,31 +928,38 @@ class EDIBackend(models.Model):
             "EDI Exchange output sync: found %d new records to process.",
             len(new_records),
         )
-        for rec in new_records:
-            job1 = rec.delayable().action_exchange_generate()
-            if not skip_send:
-                # Chain send job.
-                # Raise prio to max to send the record out as fast as possible.
-                job1.on_done(rec.delayable(priority=0).action_exchange_send())
-            job1.delay()
+        # Chain send job.
+        # Raise prio to max to send the record out as fast as possible.
+        new_records.delay_batch(
+            "action_exchange_generate",
+            next_method_name=None if skip_send else "action_exchange_send",
+        )
 
         if skip_send:
             return
         pending_records = self.exchange_record_model.search(
             self._output_pending_records_domain(
-                skip_sent=skip_sent, record_ids=record_ids
+                skip_sent=skip_sent, record_ids=record_ids, pending_only=pending_only
             )
         )
         _logger.info(
             "EDI Exchange output sync: found %d pending records to process.",
             len(pending_records),
         )
-        for rec in pending_records:
-            if rec.edi_exchange_state == "output_pending":
-                rec.with_delay().action_exchange_send()
-            else:
-                # TODO: run in job as well?
-                self._exchange_output_check_state(rec)
+        to_send = pending_records.filtered(
+            lambda x: x.edi_exchange_state == "output_pending"
+        )
+        to_send.delay_batch("action_exchange_send")
+        self._delay_output_check_state(pending_records - to_send)
+
+    def _delay_output_check_state(self, exchange_records):
+        """Check given records state in jobs, by chunks of `check_batch_size`."""
+        job_params = {}
+        if self.check_job_channel_id:
+            job_params["channel"] = self.check_job_channel_id.complete_name
+        return exchange_records.delay_batch(
+            "action_exchange_check", batch_size=self.check_batch_size, **job_params
+        )
 
     def _get_new_output_exchange_records(self, record_ids=None):
         return self.exchange_record_model.search(
@@ -438,25 +971,29 @@ class EDIBackend(models.Model):
         domain = [
             ("backend_id", "=", self.id),
             ("type_id.exchange_file_auto_generate", "=", True),
-            ("type_id.direction", "=", "output"),
+            ("direction", "=", "output"),
             ("edi_exchange_state", "=", "new"),
-            ("exchange_file", "=", False),
+            ("has_file", "=", False),
         ]
         if record_ids:
             domain.append(("id", "in", record_ids))
         return domain
 
-    def _output_pending_records_domain(self, skip_sent=True, record_ids=None):
+    def _output_pending_records_domain(
+        self, skip_sent=True, record_ids=None, pending_only=False
+    ):
         """Domain for pending output records.
 
         Records might be waiting to be sent or have errors or have ack to handle."""
-        states = ("output_pending", "output_sent_and_error")
-        if not skip_sent:
+        states = ("output_pending",)
+        if not pending_only:
+            states += ("output_sent_and_error",)
+        if not skip_sent and not pending_only:
             # If you want to update sent records
             # you'll have to provide a `check` component.
             states += ("output_sent",)
         domain = [
-            ("type_id.direction", "=", "output"),
+            ("direction", "=", "output"),
             ("backend_id", "=", self.id),
             ("edi_exchange_state", "in", states),
         ]
@@ -467,16 +1004,40 @@ class EDIBackend(models.Model):
     def _exchange_output_check_state(self, exchange_record):
         component = self._get_component(exchange_record, "check")
         if component:
-            return component.check()
+            with self._measure(exchange_record, "check", "call"):
+                return component.check()
         raise NotImplementedError("No handler for `_exchange_output_check_state`")
 
+    def _exchange_output_check_state_many(self, exchange_records):
+        """Check the state of many records at once.
+
+        :return: dict of check results by record ID
+        """
+        results = {}
+        for __, records in groupby(exchange_records, key=lambda x: x.type_id):
+            records = exchange_records.browse().concat(*records)
+            # Not bound to the 1st record: `check_many` must only use `records`
+            component = self._get_component(records[0], "check", bound=False)
+            if not component:
+                raise NotImplementedError(
+                    "No handler for `_exchange_output_check_state_many`"
+                )
+            if not hasattr(component, "check_many"):
+                # Components not based on `edi.component.check.mixin`
+                results.update(
+                    {rec.id: self._exchange_output_check_state(rec) for rec in records}
+                )
+                continue
+            results.update(component.check_many(records))
+        return results
+
     def _exchange_process_check(self, exchange_record):
         if not exchange_record.direction == "input":
             raise exceptions.UserError(
                 _("Record ID=%d is not meant to be processed") % exchange_record.id
             )
         if (
-            not exchange_record.exchange_file
+            not exchange_record.has_file
             and not exchange_record.type_id.allow_empty_files_on_receive
         ):
             raise exceptions.UserError(
@@ -498,6 +1059,7 @@ class EDIBackend(models.Model):
         old_state = state = exchange_record.edi_exchange_state
         error = False
         message = None
+        start = time.perf_counter()
         try:
             res = self._exchange_process(exchange_record)
         except self._swallable_exceptions():
@@ -510,15 +1072,13 @@ class EDIBackend(models.Model):
             error = None
             state = "input_processed"
         finally:
-            exchange_record.write(
-                {
-                    "edi_exchange_state": state,
-                    "exchange_error": error,
-                    # FIXME: this should come from _compute_exchanged_on
-                    # but somehow it's failing in send tests (in record tests it works).
-                    "exchanged_on": fields.Datetime.now(),
-                }
-            )
+            action_duration = time.perf_counter() - start
+            with self._measure(exchange_record, "process", "write"):
+                self.exchange_records_transition(
+                    [(exchange_record, state, error)],
+                    action_duration=action_duration,
+                    strict=False,
+                )
             if (
                 state == "input_processed_error"
                 and old_state != "input_processed_error"
@@ -526,13 +1086,16 @@ class EDIBackend(models.Model):
                 exchange_record._notify_error("process_ko")
             elif state == "input_processed":
                 exchange_record._notify_done()
-        exchange_record.notify_action_complete("process", message=message)
+        with self._measure(exchange_record, "process", "notify"):
+            exchange_record.notify_action_complete("process", message=message)
+        self._flush_metrics()
         return res
 
     def _exchange_process(self, exchange_record):
         component = self._get_component(exchange_record, "process")
         if component:
-            return component.process()
+            with self._measure(exchange_record, "process", "call"):
+                return component.process()
         raise NotImplementedError()
 
     def exchange_receive(self, exchange_record):
@@ -547,6 +1110,7 @@ class EDIBackend(models.Model):
         error = False
         message = None
         content = None
+        start = time.perf_counter()
         try:
             content = self._exchange_receive(exchange_record)
             # Ignore result of FileNotFoundError/OSError
@@ -571,16 +1135,16 @@ class EDIBackend(models.Model):
             state = "input_received"
             res = message
         finally:
-            exchange_record.write(
-                {
-                    "edi_exchange_state": state,
-                    "exchange_error": error,
-                    # FIXME: this should come from _compute_exchanged_on
-                    # but somehow it's failing in send tests (in record tests it works).
-                    "exchanged_on": fields.Datetime.now(),
-                }
-            )
-        exchange_record.notify_action_complete("receive", message=message)
+            action_duration = time.perf_counter() - start
+            with self._measure(exchange_record, "receive", "write"):
+                self.exchange_records_transition(
+                    [(exchange_record, state, error)],
+                    action_duration=action_duration,
+                    strict=False,
+                )
+        with self._measure(exchange_record, "receive", "notify"):
+            exchange_record.notify_action_complete("receive", message=message)
+        self._flush_metrics()
         return res
 
     def _exchange_receive_check(self, exchange_record):
@@ -599,12 +1163,12 @@ class EDIBackend(models.Model):
     def _exchange_receive(self, exchange_record):
         component = self._get_component(exchange_record, "receive")
         if component:
-            return component.receive()
+            with self._measure(exchange_record, "receive", "call"):
+                return component.receive()
         raise NotImplementedError()
 
     def _cron_check_input_exchange_sync(self, **kw):
-        for backend in self:
-            backend._check_input_exchange_sync(**kw)
+        self._cron_check_exchange_sync("input", **kw)
 
     # TODO: add tests
     # TODO: consider splitting cron in 2 (1 for receiving, 1 for processing)
@@ -621,8 +1185,7 @@ class EDIBackend(models.Model):
             "EDI Exchange input sync: found %d pending records to receive.",
             len(pending_records),
         )
-        for rec in pending_records:
-            rec.with_delay().action_exchange_receive()
+        pending_records.delay_batch("action_exchange_receive")
 
         pending_process_records = self.exchange_record_model.search(
             self._input_pending_process_records_domain(record_ids=record_ids)
@@ -631,15 +1194,14 @@ class EDIBackend(models.Model):
             "EDI Exchange input sync: found %d pending records to process.",
             len(pending_process_records),
         )
-        for rec in pending_process_records:
-            rec.with_delay().action_exchange_process()
+        pending_process_records.delay_batch("action_exchange_process")
 
     def _input_pending_records_domain(self, record_ids=None):
         domain = [
             ("backend_id", "=", self.id),
-            ("type_id.direction", "=", "input"),
+            ("direction", "=", "input"),
             ("edi_exchange_state", "=", "input_pending"),
-            ("exchange_file", "=", False),
+            ("has_file", "=", False),
         ]
         if record_ids:
             domain.append(("id", "in", record_ids))
@@ -649,7 +1211,7 @@ class EDIBackend(models.Model):
         states = ("input_received",)
         domain = [
             ("backend_id", "=", self.id),
-            ("type_id.direction", "=", "input"),
+            ("direction", "=", "input"),
             ("edi_exchange_state", "in", states),
         ]
         if record_ids:
@@ -0,0 +1,252 @@
+# Copyright 2026 Camptocamp SA
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import json
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+from ..instrumentation import BUCKETS
+from ..utils import get_worker
+
+
+class EDIBackendMetric(models.Model):
+    """Timing of EDI actions phases, as flushed by each worker.
+
+    See `edi_oca.instrumentation`.
+    """
+
+    _name = "edi.backend.metric"
+    _description = "EDI backend metric"
+    _order = "date desc, id desc"
+    _log_access = False
+
+    date = fields.Datetime(required=True, readonly=True, index=True)
+    worker = fields.Char(readonly=True)
+    backend_type = fields.Char(readonly=True)
+    exchange_type = fields.Char(readonly=True)
+    action = fields.Char(readonly=True)
+    phase = fields.Char(readonly=True)
+    count = fields.Integer(readonly=True)
+    wall_time = fields.Float(readonly=True)
+    cpu_time = fields.Float(readonly=True)
+    queries = fields.Integer(readonly=True)
+    # JSON list of measures count per wall time bucket
+    buckets = fields.Char(readonly=True)
+
+    _default_retention_days = 30
+    # Prometheus labels of the metrics
+    _labels = ("backend_type", "exchange_type", "action", "phase")
+
+    @api.model
+    def _store(self, stats):
+        """Store measures collected by `instrumentation.Recorder` w/ one INSERT."""
+        if not stats:
+            return
+        date = fields.Datetime.now()
+        worker = get_worker()
+        self.env.cr.execute(
+            SQL(
+                """
+                INSERT INTO edi_backend_metric (
+                    date, worker, backend_type, exchange_type, action, phase,
+                    count, wall_time, cpu_time, queries, buckets
+                ) VALUES %s
+                """,
+                SQL(", ").join(
+                    SQL(
+                        "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                        date,
+                        worker,
+                        *key,
+                        stat.count,
+                        stat.wall_time,
+                        stat.cpu_time,
+                        stat.queries,
+                        json.dumps(stat.buckets),
+                    )
+                    for key, stat in stats.items()
+                ),
+            )
+        )
+
+    @api.autovacuum
+    def _gc_metrics(self):
+        days = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("edi_oca.metric_retention_days", self._default_retention_days)
+        )
+        limit = fields.Datetime.now() - timedelta(days=days)
+        # Prometheus counters must not decrease: keep the totals of removed rows
+        where = SQL("date < %s", limit)
+        self.env["edi.backend.metric.total"]._add(self._get_totals(where=where))
+        self.env.cr.execute(SQL("DELETE FROM edi_backend_metric WHERE %s", where))
+
+    @api.model
+    def _get_totals(self, table=None, where=None):
+        """Sum measures by labels.
+
+        :param table: table to read, defaults to metrics one
+        :param where: SQL condition on the rows to sum
+        :return: dict of `[count, wall_time, cpu_time, queries, buckets]` by labels
+        """
+        table = SQL.identifier(table or self._table)
+        where = where or SQL("TRUE")
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT backend_type, exchange_type, action, phase,
+                    sum(count), sum(wall_time), sum(cpu_time), sum(queries)
+                FROM %s
+                WHERE %s
+                GROUP BY backend_type, exchange_type, action, phase
+                ORDER BY backend_type, exchange_type, action, phase
+                """,
+                table,
+                where,
+            )
+        )
+        totals = {
+            tuple(row[:4]): [*row[4:], [0] * (len(BUCKETS) + 1)]
+            for row in self.env.cr.fetchall()
+        }
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT backend_type, exchange_type, action, phase,
+                    bucket.idx, sum(bucket.value::integer)
+                FROM %s,
+                    jsonb_array_elements_text(buckets::jsonb)
+                        WITH ORDINALITY AS bucket(value, idx)
+                WHERE %s
+                GROUP BY backend_type, exchange_type, action, phase, bucket.idx
+                """,
+                table,
+                where,
+            )
+        )
+        for *key, idx, value in self.env.cr.fetchall():
+            totals[tuple(key)][4][idx - 1] = value
+        return totals
+
+    @api.model
+    def _merge_totals(self, totals, other):
+        """Add `other` totals to `totals`, see `_get_totals`."""
+        for key, values in other.items():
+            if key not in totals:
+                totals[key] = values
+                continue
+            current = totals[key]
+            for i in range(4):
+                current[i] += values[i]
+            current[4] = [a + b for a, b in zip(current[4], values[4], strict=True)]
+        return dict(sorted(totals.items(), key=lambda x: [v or "" for v in x[0]]))
+
+    @api.model
+    def _prometheus_text(self):
+        """Render stored metrics in Prometheus text exposition format.
+
+        Totals of the metrics removed by the garbage collector are included.
+        """
+        totals = self._merge_totals(
+            self.env["edi.backend.metric.total"]._get_totals(), self._get_totals()
+        )
+        lines = [
+            "# HELP edi_action_duration_seconds Wall time of EDI actions phases.",
+            "# TYPE edi_action_duration_seconds histogram",
+        ]
+        for key, (count, wall_time, __, __, key_buckets) in totals.items():
+            labels = self._prometheus_labels(key)
+            cumulated = 0
+            for bound, value in zip((*BUCKETS, "+Inf"), key_buckets, strict=True):
+                cumulated += value
+                lines.append(
+                    f'edi_action_duration_seconds_bucket{{{labels},le="{bound}"}} '
+                    f"{cumulated}"
+                )
+            lines.append(f"edi_action_duration_seconds_sum{{{labels}}} {wall_time}")
+            lines.append(f"edi_action_duration_seconds_count{{{labels}}} {int(count)}")
+        lines += [
+            "# HELP edi_action_cpu_seconds_total CPU time of EDI actions phases.",
+            "# TYPE edi_action_cpu_seconds_total counter",
+        ]
+        for key, (__, __, cpu_time, __, __) in totals.items():
+            labels = self._prometheus_labels(key)
+            lines.append(f"edi_action_cpu_seconds_total{{{labels}}} {cpu_time}")
+        lines += [
+            "# HELP edi_action_queries_total SQL queries of EDI actions phases.",
+            "# TYPE edi_action_queries_total counter",
+        ]
+        for key, (__, __, __, queries, __) in totals.items():
+            labels = self._prometheus_labels(key)
+            lines.append(f"edi_action_queries_total{{{labels}}} {int(queries)}")
+        return "\n".join(lines) + "\n"
+
+    def _prometheus_labels(self, key):
+        return ",".join(
+            '{}="{}"'.format(
+                label,
+                (value or "")
+                .replace("\\", "\\\\")
+                .replace('"', '\\"')
+                .replace("\n", "\\n"),
+            )
+            for label, value in zip(self._labels, key, strict=True)
+        )
+
+
+class EDIBackendMetricTotal(models.Model):
+    """Totals of the metrics removed by the garbage collector.
+
+    Keep Prometheus counters growing, see `edi.backend.metric._gc_metrics`.
+    """
+
+    _name = "edi.backend.metric.total"
+    _description = "EDI backend metric total"
+    _log_access = False
+
+    backend_type = fields.Char(readonly=True)
+    exchange_type = fields.Char(readonly=True)
+    action = fields.Char(readonly=True)
+    phase = fields.Char(readonly=True)
+    # Float: totals outgrow integer columns
+    count = fields.Float(readonly=True)
+    wall_time = fields.Float(readonly=True)
+    cpu_time = fields.Float(readonly=True)
+    queries = fields.Float(readonly=True)
+    buckets = fields.Char(readonly=True)
+
+    @api.model
+    def _get_totals(self):
+        return self.env["edi.backend.metric"]._get_totals(table=self._table)
+
+    @api.model
+    def _add(self, totals):
+        """Add given totals to the stored ones, one row per labels."""
+        if not totals:
+            return
+        totals = self.env["edi.backend.metric"]._merge_totals(
+            self._get_totals(), totals
+        )
+        self.env.cr.execute(SQL("DELETE FROM edi_backend_metric_total"))
+        self.env.cr.execute(
+            SQL(
+                """
+                INSERT INTO edi_backend_metric_total (
+                    backend_type, exchange_type, action, phase,
+                    count, wall_time, cpu_time, queries, buckets
+                ) VALUES %s
+                """,
+                SQL(", ").join(
+                    SQL(
+                        "(%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                        *key,
+                        *values[:4],
+                        json.dumps(values[4]),
+                    )
+                    for key, values in totals.items()
+                ),
+            )
+        )
@@ -0,0 +1,52 @@
+# Copyright 2026 Camptocamp SA
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+
+class EDIBackendSyncRequest(models.Model):
+    """Backends having records changed since their last sync.
+
+    Requests are inserted once the transactions changing records
+    are committed, see `edi.backend._schedule_sync`,
+    and deleted by the syncs taking care of them.
+    Rows are never updated: concurrent transactions do not wait on each other.
+    """
+
+    _name = "edi.backend.sync.request"
+    _description = "EDI backend sync request"
+    _log_access = False
+
+    backend_id = fields.Many2one(
+        comodel_name="edi.backend",
+        required=True,
+        ondelete="cascade",
+        index=True,
+        readonly=True,
+    )
+    direction = fields.Selection(
+        selection=[("input", "Input"), ("output", "Output")],
+        required=True,
+        readonly=True,
+    )
+
+    @api.model
+    def _add(self, requests):
+        """Insert given requests w/ one query.
+
+        :param requests: iterable of `(backend ID, direction)`
+        """
+        requests = sorted(requests)
+        if not requests:
+            return
+        self.env.cr.execute(
+            SQL(
+                "INSERT INTO edi_backend_sync_request (backend_id, direction) "
+                "VALUES %s",
+                SQL(", ").join(
+                    SQL("(%s, %s)", backend_id, direction)
+                    for backend_id, direction in requests
+                ),
+            )
+        )
@@ -288,6 +288,11 @@ class EDIExchangeConsumerMixin(models.AbstractModel):
             check_operation = operation
         return check_operation
 
+    def write(self, vals):
+        # Access to related exchange records might depend on written values
+        self.env["edi.exchange.record"]._clear_access_cache(self._name)
+        return super().write(vals)
+
     def _edi_set_origin(self, exc_record):
         self.sudo().update({"origin_exchange_record_id": exc_record.id})
 
@@ -0,0 +1,176 @@
+# Copyright 2026 Camptocamp SA
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import hashlib
+import re
+from collections import Counter
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+# Values varying between occurrences of the same error
+_VARIABLE_VALUES = re.compile(
+    r"0x[0-9a-fA-F]+"  # memory addresses
+    r"|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|'[^'\n]*'|\"[^\"\n]*\""  # quoted values
+    r"|\d+"
+)
+_FRAME_LINE_NUMBER = re.compile(r", line \d+,")
+
+
+def split_traceback(error):
+    """Split given traceback text in frames and exception lines."""
+    lines = error.strip().splitlines()
+    if not lines or not lines[0].startswith("Traceback"):
+        # Plain message (e.g. validation errors)
+        return [], lines
+    # Exception message comes after the last indented (frame or code) line
+    last_frame = max(
+        (i for i, line in enumerate(lines) if line.startswith(" ")), default=-1
+    )
+    return lines[: last_frame + 1], lines[last_frame + 1 :]
+
+
+class EDIExchangeError(models.Model):
+    """Errors of exchange records, deduplicated by fingerprint.
+
+    The fingerprint is a hash of the normalized traceback:
+    line numbers and values likely to change (numbers, quoted values...)
+    are ignored so that the same failure always gets the same fingerprint.
+    """
+
+    _name = "edi.exchange.error"
+    _description = "EDI exchange error"
+    _order = "last_seen desc, id desc"
+    _log_access = False
+
+    name = fields.Char(required=True, readonly=True)
+    fingerprint = fields.Char(required=True, readonly=True)
+    traceback = fields.Text(readonly=True, help="First occurrence of the error.")
+    first_seen = fields.Datetime(readonly=True)
+    last_seen = fields.Datetime(readonly=True, index=True)
+    count = fields.Integer(readonly=True, help="Occurrences of the error.")
+    exchange_record_ids = fields.One2many(
+        comodel_name="edi.exchange.record",
+        inverse_name="error_id",
+        readonly=True,
+    )
+
+    _sql_constraints = [
+        ("fingerprint_uniq", "unique(fingerprint)", "Fingerprint must be unique."),
+    ]
+
+    # Max length of the error name
+    _name_max_length = 256
+    # Max length of the error details stored on exchange records
+    _detail_max_length = 2000
+
+    @api.model
+    def _fingerprint(self, error):
+        frames, exception = split_traceback(error)
+        normalized = [_FRAME_LINE_NUMBER.sub(",", line) for line in frames]
+        normalized += [_VARIABLE_VALUES.sub("?", line) for line in exception]
+        return hashlib.sha1("\n".join(normalized).encode()).hexdigest()
+
+    @api.model
+    def _get_detail(self, error):
+        """Short version of given error to be stored on each exchange record."""
+        __, exception = split_traceback(error)
+        return "\n".join(exception)[: self._detail_max_length]
+
+    @api.model
+    def _get_name(self, error):
+        __, exception = split_traceback(error)
+        return (exception[0] if exception else "")[: self._name_max_length]
+
+    @api.model
+    def _register(self, errors):
+        """Get errors IDs, creating missing ones w/ one query per distinct error.
+
+        Existing rows are not locked by the current transaction:
+        their occurrences are counted once it's committed, see `_count_occurrences`.
+        Fingerprints are processed in a stable order
+        so that concurrent transactions cannot deadlock.
+
+        :param errors: list of traceback texts, one per failed exchange record
+        :return: dict of `edi.exchange.error` IDs by traceback text
+        """
+        fingerprints = {error: self._fingerprint(error) for error in set(errors)}
+        counts = Counter(fingerprints[error] for error in errors)
+        samples = {}
+        for error in errors:
+            samples.setdefault(fingerprints[error], error)
+        now = fields.Datetime.now()
+        ids = {}
+        occurrences = {}
+        for fingerprint in sorted(samples):
+            error = samples[fingerprint]
+            self.env.cr.execute(
+                SQL(
+                    """
+                    INSERT INTO edi_exchange_error (
+                        name, fingerprint, traceback, first_seen, last_seen, count
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (fingerprint) DO NOTHING
+                    RETURNING id
+                    """,
+                    self._get_name(error) or fingerprint,
+                    fingerprint,
+                    error,
+                    now,
+                    now,
+                    counts[fingerprint],
+                )
+            )
+            row = self.env.cr.fetchone()
+            if not row:
+                self.env.cr.execute(
+                    SQL(
+                        "SELECT id FROM edi_exchange_error WHERE fingerprint = %s",
+                        fingerprint,
+                    )
+                )
+                row = self.env.cr.fetchone()
+                occurrences[row[0]] = counts[fingerprint]
+            ids[fingerprint] = row[0]
+        if occurrences:
+            self._count_occurrences(occurrences)
+        return {error: ids[fingerprint] for error, fingerprint in fingerprints.items()}
+
+    @api.model
+    def _count_occurrences(self, occurrences):
+        """Count new occurrences of existing errors once the transaction is committed.
+
+        Counters are updated in a short transaction of their own:
+        concurrent failures only wait on each other for a single update.
+
+        :param occurrences: dict of occurrences count by error ID
+        """
+        postcommit = self.env.cr.postcommit
+        if "edi_oca.error_occurrences" not in postcommit.data:
+            postcommit.add(self._flush_occurrences)
+        pending = postcommit.data.setdefault("edi_oca.error_occurrences", Counter())
+        pending.update(occurrences)
+
+    @api.model
+    def _flush_occurrences(self):
+        occurrences = self.env.cr.postcommit.data.pop("edi_oca.error_occurrences", {})
+        if not occurrences:
+            return
+        now = fields.Datetime.now()
+        with self.env.registry.cursor() as cr:
+            # Stable order: concurrent updates cannot deadlock
+            for error_id in sorted(occurrences):
+                cr.execute(
+                    SQL(
+                        """
+                        UPDATE edi_exchange_error
+                        SET count = count + %s, last_seen = %s
+                        WHERE id = %s
+                        """,
+                        occurrences[error_id],
+                        now,
+                        error_id,
+                    )
+                )
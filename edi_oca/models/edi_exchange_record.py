@@ -5,16 +5,39 @@
 
 import base64
 import logging
+import mmap
+import uuid
+import weakref
 from ast import literal_eval
-from collections import defaultdict
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import partial
 
 from odoo import _, api, exceptions, fields, models
 from odoo.exceptions import AccessError
+from odoo.tools import SQL, groupby
+from odoo.tools.sql import create_index
+
+from odoo.addons.queue_job.exception import FailedJobError, RetryableJobError
+from odoo.addons.queue_job.job import (
+    DEFAULT_MAX_RETRIES,
+    ENQUEUED,
+    PENDING,
+    WAIT_DEPENDENCIES,
+    Job,
+)
+from odoo.addons.queue_job.utils import must_run_without_delay
 
 from ..utils import exchange_record_job_identity_exact, get_checksum
 
 _logger = logging.getLogger(__name__)
 
+# Identifier numbers reserved by current worker, by (dbname, sequence id)
+_identifier_numbers_pool = defaultdict(deque)
+
+# Access decisions by cursor, see `EDIExchangeRecord._get_access_cache`
+_access_caches = weakref.WeakKeyDictionary()
+
 
 class EDIExchangeRecord(models.Model):
     """
@@ -37,7 +60,7 @@ class EDIExchangeRecord(models.Model):
         auto_join=True,
         index=True,
     )
-    direction = fields.Selection(related="type_id.direction")
+    direction = fields.Selection(related="type_id.direction", store=True)
     backend_id = fields.Many2one(comodel_name="edi.backend", required=True)
     model = fields.Char(index=True, required=False, readonly=True)
     res_id = fields.Many2oneReference(
@@ -51,12 +74,11 @@ class EDIExchangeRecord(models.Model):
     related_record_exists = fields.Boolean(compute="_compute_related_record_exists")
     related_name = fields.Char(compute="_compute_related_name", compute_sudo=True)
     exchange_file = fields.Binary(attachment=True, copy=False)
+    has_file = fields.Boolean(compute="_compute_file_checksum", store=True)
     exchange_filename = fields.Char(
         compute="_compute_exchange_filename", readonly=False, store=True
     )
-    exchange_filechecksum = fields.Char(
-        compute="_compute_exchange_filechecksum", store=True
-    )
+    exchange_filechecksum = fields.Char(compute="_compute_file_checksum", store=True)
     exchanged_on = fields.Datetime(
         help="Sent or received on this date.",
         compute="_compute_exchanged_on",
@@ -88,10 +110,20 @@ class EDIExchangeRecord(models.Model):
         ],
     )
     exchange_error = fields.Text(string="Exchange error", readonly=True, copy=False)
+    error_id = fields.Many2one(
+        string="Error",
+        comodel_name="edi.exchange.error",
+        readonly=True,
+        copy=False,
+        index="btree_not_null",
+        ondelete="set null",
+    )
     # Relations w/ other records
     parent_id = fields.Many2one(
         comodel_name="edi.exchange.record",
         help="Original exchange which originated this record",
+        # Used to look up ACKs and related records
+        index="btree_not_null",
     )
     related_exchange_ids = fields.One2many(
         string="Related records",
@@ -115,6 +147,15 @@ class EDIExchangeRecord(models.Model):
         compute="_compute_retryable",
         help="The record state can be rolled back manually in case of failure.",
     )
+    queue_job_ids = fields.Many2many(
+        string="Jobs",
+        comodel_name="queue.job",
+        relation="edi_exchange_record_queue_job_rel",
+        column1="exchange_record_id",
+        column2="job_id",
+        readonly=True,
+        copy=False,
+    )
     related_queue_jobs_count = fields.Integer(
         compute="_compute_related_queue_jobs_count"
     )
@@ -128,28 +169,78 @@ class EDIExchangeRecord(models.Model):
             "The external_identifier must be unique for a type and a backend.",
         ),
     ]
+    # States looked up by sync crons
+    _sync_pending_states = (
+        "new",
+        "output_pending",
+        "output_sent_and_error",
+        "input_pending",
+        "input_received",
+    )
+
+    def init(self):
+        # Sync crons only look for few records among the (many) ones done already
+        states = ", ".join(f"'{state}'" for state in self._sync_pending_states)
+        create_index(
+            self.env.cr,
+            "edi_exchange_record_sync_pending_index",
+            self._table,
+            ["backend_id", "edi_exchange_state"],
+            where=f"edi_exchange_state IN ({states})",
+        )
 
     @api.depends("model", "res_id")
     def _compute_related_name(self):
+        related_records = self._get_related_records(with_names=True)
         for rec in self:
-            related_record = rec.record
+            related_record = related_records[rec]
             rec.related_name = related_record.display_name if related_record else ""
 
     @api.depends("model", "type_id")
     def _compute_exchange_filename(self):
-        for rec in self:
-            if not rec.type_id:
-                continue
-            if not rec.exchange_filename:
-                rec.exchange_filename = rec.type_id._make_exchange_filename(rec)
+        todo = self.filtered(lambda x: x.type_id and not x.exchange_filename)
+        for exc_type, records in groupby(todo, key=lambda x: x.type_id):
+            # Same date for the whole batch
+            dt = exc_type._make_exchange_filename_datetime()
+            for rec in records:
+                rec.exchange_filename = exc_type._make_exchange_filename(rec, dt=dt)
 
     @api.depends("exchange_file")
-    def _compute_exchange_filechecksum(self):
+    def _compute_file_checksum(self):
+        checksums = self._get_file_checksums()
         for rec in self:
-            content = rec.exchange_file or ""
-            if not isinstance(content, bytes):
-                content = content.encode()
-            rec.exchange_filechecksum = get_checksum(content)
+            rec.exchange_filechecksum = checksums[rec]
+            rec.has_file = bool(checksums[rec])
+
+    def _get_file_checksums(self):
+        """SHA1 of the raw content of `exchange_file` by record.
+
+        Taken from the file attachment, which computes it once when stored:
+        file contents are not loaded.
+        """
+        attachments = (
+            self.env["ir.attachment"]
+            .sudo()
+            .search_read(
+                [
+                    ("res_model", "=", self._name),
+                    ("res_field", "=", "exchange_file"),
+                    ("res_id", "in", [_id for _id in self.ids if _id]),
+                ],
+                ["res_id", "checksum"],
+            )
+        )
+        by_res_id = {att["res_id"]: att["checksum"] for att in attachments}
+        checksums = {}
+        for rec in self:
+            if rec.id:
+                checksums[rec] = by_res_id.get(rec.id, False)
+            elif rec.exchange_file:
+                # New record: no attachment yet
+                checksums[rec] = get_checksum(base64.b64decode(rec.exchange_file))
+            else:
+                checksums[rec] = False
+        return checksums
 
     @api.depends("edi_exchange_state")
     def _compute_exchanged_on(self):
@@ -169,8 +260,38 @@ class EDIExchangeRecord(models.Model):
 
     @api.depends("related_exchange_ids.type_id")
     def _compute_ack_exchange_id(self):
+        ack_ids = self._get_ack_record_ids()
         for rec in self:
-            rec.ack_exchange_id = rec._get_ack_record()
+            if not rec.id:
+                # New record: not in database yet
+                rec.ack_exchange_id = rec._get_ack_record()
+                continue
+            rec.ack_exchange_id = ack_ids.get(rec.id)
+
+    def _get_ack_record_ids(self):
+        """Latest ACK record ID by exchange record ID w/ a single query."""
+        ids = [_id for _id in self.ids if _id]
+        if not ids:
+            return {}
+        self.flush_model(["parent_id", "type_id"])
+        self.env["edi.exchange.type"].flush_model(["ack_type_id"])
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT parent.id, max(child.id)
+                FROM edi_exchange_record parent
+                JOIN edi_exchange_type parent_type
+                    ON parent_type.id = parent.type_id
+                JOIN edi_exchange_record child
+                    ON child.parent_id = parent.id
+                    AND child.type_id = parent_type.ack_type_id
+                WHERE parent.id IN %s
+                GROUP BY parent.id
+                """,
+                tuple(ids),
+            )
+        )
+        return dict(self.env.cr.fetchall())
 
     def _get_ack_record(self):
         if not self.type_id.ack_type_id:
@@ -181,14 +302,16 @@ class EDIExchangeRecord(models.Model):
             ).sorted("id", reverse=True)
         )
 
+    @api.depends("type_id.ack_type_id")
     def _compute_ack_expected(self):
         for rec in self:
-            rec.ack_expected = bool(self.type_id.ack_type_id)
+            rec.ack_expected = bool(rec.type_id.ack_type_id)
 
     @api.depends("res_id", "model")
     def _compute_related_record_exists(self):
+        related_records = self._get_related_records()
         for rec in self:
-            rec.related_record_exists = bool(rec.record)
+            rec.related_record_exists = bool(related_records[rec])
 
     def needs_ack(self):
         return self.type_id.ack_type_id and not self.ack_exchange_id
@@ -216,6 +339,41 @@ class EDIExchangeRecord(models.Model):
             return self.parent_id.record
         return self.env[self.model].browse(self.res_id).exists()
 
+    def _get_related_records(self, with_names=False):
+        """Related documents of the records, as `record` does it, in bulk.
+
+        One existence check per model (and one `display_name` computation
+        if `with_names` is set) instead of one per exchange record.
+
+        :return: dict of related document (or None) by exchange record
+        """
+        sources = {}
+        for rec in self:
+            source = rec
+            # Records w/o document get the one of their parent
+            while not source.model and source.parent_id:
+                source = source.parent_id
+            sources[rec] = source
+        by_model = defaultdict(set)
+        for source in sources.values():
+            if source.model and source.res_id:
+                by_model[source.model].add(source.res_id)
+        documents = {}
+        for model, res_ids in by_model.items():
+            existing = self.env[model].browse(res_ids).exists()
+            if with_names:
+                existing.mapped("display_name")
+            documents.update({(model, doc.id): doc for doc in existing})
+        result = {}
+        for rec, source in sources.items():
+            if not source.model:
+                result[rec] = None
+                continue
+            result[rec] = documents.get(
+                (source.model, source.res_id), self.env[source.model]
+            )
+        return result
+
     def _set_file_content(
         self, output_string, encoding="utf-8", field_name="exchange_file"
     ):
@@ -223,48 +381,217 @@ class EDIExchangeRecord(models.Model):
         self.ensure_one()
         if not isinstance(output_string, bytes):
             output_string = bytes(output_string, encoding)
-        self[field_name] = base64.b64encode(output_string)
+        self._set_file_raw(output_string, field_name=field_name)
 
     def _get_file_content(
         self, field_name="exchange_file", binary=True, as_bytes=False
     ):
         """Handy method to not have to convert b64 back and forth."""
         self.ensure_one()
+        if not binary:
+            return self[field_name] or ""
+        res = self._get_file_raw(field_name=field_name)
+        if not res:
+            return ""
+        if as_bytes:
+            return res
         encoding = self.type_id.encoding or "UTF-8"
         decoding_error_handler = self.type_id.encoding_in_error_handler or "strict"
-        if not self[field_name]:
-            return ""
-        if binary:
-            res = base64.b64decode(self[field_name])
-            return (
-                res.decode(encoding, errors=decoding_error_handler)
-                if not as_bytes
-                else res
+        return res.decode(encoding, errors=decoding_error_handler)
+
+    def _get_file_attachment(self, field_name="exchange_file"):
+        self.ensure_one()
+        return (
+            self.env["ir.attachment"]
+            .sudo()
+            .search(
+                [
+                    ("res_model", "=", self._name),
+                    ("res_field", "=", field_name),
+                    ("res_id", "=", self.id),
+                ],
+                limit=1,
             )
-        return self[field_name]
+        )
+
+    def _set_file_raw(self, content, field_name="exchange_file"):
+        """Store given raw bytes as file w/o base64 encoding them.
+
+        Content is written straight to the attachment of the field.
+        """
+        self.ensure_one()
+        if not self._fields[field_name].attachment or not self.id:
+            self[field_name] = base64.b64encode(content) if content else False
+            return
+        self.check_access("write")
+        attachment = self._get_file_attachment(field_name=field_name)
+        if not content:
+            attachment.unlink()
+        elif attachment:
+            attachment.write({"raw": content})
+        else:
+            attachment.create(
+                {
+                    "name": field_name,
+                    "res_model": self._name,
+                    "res_field": field_name,
+                    "res_id": self.id,
+                    "type": "binary",
+                    "raw": content,
+                }
+            )
+        self.invalidate_recordset([field_name])
+        self.modified([field_name])
+
+    def _get_file_raw(self, field_name="exchange_file"):
+        """Raw bytes of the file w/o base64 decoding them."""
+        self.ensure_one()
+        if not self._fields[field_name].attachment or not self.id:
+            value = self[field_name]
+            return base64.b64decode(value) if value else b""
+        self.check_access("read")
+        return self._get_file_attachment(field_name=field_name).raw or b""
+
+    @contextmanager
+    def _open_file(self, field_name="exchange_file"):
+        """Read-only view of the file content, memory-mapped when possible.
+
+        Large files are not loaded in memory: the view is only valid
+        within the `with` block.
+
+            with record._open_file() as content:
+                header = bytes(content[:10])
+        """
+        self.ensure_one()
+        self.check_access("read")
+        attachment = self.env["ir.attachment"]
+        if self._fields[field_name].attachment and self.id:
+            attachment = self._get_file_attachment(field_name=field_name)
+        if not attachment.store_fname or not attachment.file_size:
+            yield memoryview(self._get_file_raw(field_name=field_name))
+            return
+        with open(attachment._full_path(attachment.store_fname), "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    yield view
+                finally:
+                    view.release()
 
     @api.depends("identifier", "res_id", "model", "type_id")
     def _compute_display_name(self):
+        related_records = self._get_related_records(with_names=True)
         for rec in self:
             rec_name = (
-                rec.record.display_name if rec.res_id and rec.model else rec.identifier
+                related_records[rec].display_name
+                if rec.res_id and rec.model
+                else rec.identifier
             )
             rec.display_name = f"[{rec.type_id.name}] {rec_name}"
 
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            vals["identifier"] = self._get_identifier()
+        identifiers = self._get_identifiers(len(vals_list))
+        for vals, identifier in zip(vals_list, identifiers, strict=True):
+            vals["identifier"] = identifier
         records = super().create(vals_list)
-        for rec in records:
-            if rec._quick_exec_enabled():
-                rec._execute_next_action()
+        to_exec = records.filtered(lambda x: x._quick_exec_enabled())
+        if to_exec:
+            to_exec._execute_next_action()
+        (records - to_exec)._schedule_sync()
         return records
 
     @api.model
     def _get_identifier(self):
         return self.env["ir.sequence"].next_by_code("edi.exchange")
 
+    @api.model
+    def _get_identifiers(self, count):
+        """Reserve `count` identifiers at once.
+
+        The allocation mode is controlled by the system parameter
+        `edi_oca.identifier_allocation`:
+
+        * `sequence` (default): one `ir.sequence` call per identifier
+        * `batch`: numbers for the whole batch are taken at once
+          from the underlying PostgreSQL sequence and formatted locally
+        * `block`: like `batch` but each worker reserves numbers by blocks
+          and consumes them on next calls. Identifiers are not chronological
+          anymore and workers must be restarted if the sequence is reset.
+
+        Fast modes require a standard sequence w/o date ranges,
+        otherwise they fall back to `sequence` mode.
+        """
+        if not count:
+            return []
+        mode = self._get_identifier_allocation_mode()
+        if count == 1 and mode == "sequence":
+            return [self._get_identifier()]
+        sequence = self._get_identifier_sequence()
+        if not sequence:
+            return [self._get_identifier() for __ in range(count)]
+        if mode == "sequence" or not self._identifier_sequence_is_native(sequence):
+            return [sequence._next() for __ in range(count)]
+        block_size = self._identifier_block_size if mode == "block" else 0
+        numbers = self._reserve_identifier_numbers(sequence, count, block_size)
+        prefix, suffix = sequence._get_prefix_suffix()
+        return [f"{prefix}{num:0{sequence.padding}d}{suffix}" for num in numbers]
+
+    # Numbers reserved at once by each worker in `block` allocation mode
+    _identifier_block_size = 100
+
+    @api.model
+    def _get_identifier_allocation_mode(self):
+        return (
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("edi_oca.identifier_allocation", "sequence")
+        )
+
+    @api.model
+    def _identifier_sequence_is_native(self, sequence):
+        return sequence.implementation == "standard" and not sequence.use_date_range
+
+    @api.model
+    def _reserve_identifier_numbers(self, sequence, count, block_size=0):
+        pool = _identifier_numbers_pool[(self.env.cr.dbname, sequence.id)]
+        numbers = []
+        while pool and len(numbers) < count:
+            try:
+                numbers.append(pool.popleft())
+            except IndexError:
+                # Consumed by another thread in the meantime
+                break
+        missing = count - len(numbers)
+        if missing:
+            # `nextval` is not transactional: reserved numbers are never
+            # given twice, even by other workers, and do not lock anything.
+            self.env.cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                (f"ir_sequence_{sequence.id:03d}", max(missing, block_size)),
+            )
+            reserved = [row[0] for row in self.env.cr.fetchall()]
+            numbers += reserved[:missing]
+            pool.extend(reserved[missing:])
+        return numbers
+
+    @api.model
+    def _get_identifier_sequence(self):
+        # Same lookup as `ir.sequence.next_by_code`
+        company_id = self.env.company.id
+        return (
+            self.env["ir.sequence"]
+            .sudo()
+            .search(
+                [
+                    ("code", "=", "edi.exchange"),
+                    ("company_id", "in", [company_id, False]),
+                ],
+                order="company_id",
+                limit=1,
+            )
+        )
+
     def _quick_exec_enabled(self):
         if self.env.context.get("edi__skip_quick_exec"):
             return False
@@ -273,11 +600,21 @@ class EDIExchangeRecord(models.Model):
     def _execute_next_action(self):
         # The backend already knows how to handle records
         # according to their direction and status.
-        # Let it decide.
-        if self.type_id.direction == "output":
-            self.backend_id._check_output_exchange_sync(record_ids=self.ids)
-        else:
-            self.backend_id._check_input_exchange_sync(record_ids=self.ids)
+        # Let it decide, once for all the records sharing backend and direction.
+        groups = groupby(self, key=lambda x: (x.backend_id, x.direction))
+        for (backend, direction), records in groups:
+            record_ids = [x.id for x in records]
+            if direction == "output":
+                backend._check_output_exchange_sync(record_ids=record_ids)
+            else:
+                backend._check_input_exchange_sync(record_ids=record_ids)
+
+    def _schedule_sync(self):
+        """Get current records handled by the next sync, which is coming soon."""
+        for (backend, direction), __ in groupby(
+            self, key=lambda x: (x.backend_id, x.direction)
+        ):
+            backend._schedule_sync(direction)
 
     @api.constrains("backend_id", "type_id")
     def _constrain_backend(self):
@@ -331,6 +668,91 @@ class EDIExchangeRecord(models.Model):
         self.ensure_one()
         return self.backend_id.exchange_receive(self)
 
+    def action_exchange_check(self):
+        """Check the state of sent records.
+
+        Unlike other actions, many records can be checked at once.
+        """
+        results = {}
+        for backend, records in groupby(self, key=lambda x: x.backend_id):
+            records = self.browse().concat(*records)
+            results.update(backend._exchange_output_check_state_many(records))
+        return results
+
+    # Job methods taking care of many records on their own
+    _multi_record_job_methods = ("action_exchange_check",)
+
+    _batch_job_methods = (
+        "action_exchange_generate",
+        "action_exchange_send",
+        "action_exchange_receive",
+        "action_exchange_process",
+    )
+
+    def action_exchange_batch(self, method_name):
+        """Run an exchange action for several records at once.
+
+        Each record runs in its own savepoint:
+        a failure is rolled back and reported w/o affecting other records.
+        Records hitting a retryable error get their own job to be retried,
+        counting the attempts of the current job.
+        The job fails when no record succeeded.
+
+        :param method_name: one of `_batch_job_methods`
+        :return: state of each record, one per line
+        """
+        if method_name not in self._batch_job_methods:
+            raise exceptions.UserError(
+                _("Method %(method)s cannot run in batch.", method=method_name)
+            )
+        current_job = self._get_current_job()
+        report = []
+        failed = self.browse()
+        for rec in self:
+            msg = ""
+            try:
+                with self.env.cr.savepoint():
+                    getattr(rec, method_name)()
+            except RetryableJobError as err:
+                if rec._delay_batch_retry(method_name, err, current_job):
+                    msg = _("retry delayed: %s", err)
+                else:
+                    failed |= rec
+                    msg = _("failed: max. retries reached: %s", err)
+            except Exception as err:
+                _logger.exception(
+                    "%s failed for exchange record ID=%d", method_name, rec.id
+                )
+                failed |= rec
+                msg = _("failed: %s", err)
+            report.append(f"{rec.identifier}: {rec.edi_exchange_state} {msg}".strip())
+        report = "\n".join(report)
+        if failed and failed == self:
+            raise FailedJobError(report)
+        return report
+
+    def _get_current_job(self):
+        job_uuid = self.env.context.get("job_uuid")
+        return Job.load(self.env, job_uuid) if job_uuid else None
+
+    def _delay_batch_retry(self, method_name, err, current_job=None):
+        """Enqueue a job to retry given method, as queue_job would do.
+
+        :return: False when the current job has no retry left
+        """
+        retry = current_job.retry if current_job else 0
+        if not err.ignore_retry:
+            retry += 1
+        max_retries = current_job.max_retries if current_job else DEFAULT_MAX_RETRIES
+        if max_retries and retry >= max_retries:
+            return False
+        if not self._get_pending_job_records(method_name):
+            job = self._make_job(method_name, max_retries=max_retries)
+            job.retry = retry
+            job.postpone(result=str(err), seconds=err.seconds)
+            job.store()
+        return True
+
     def exchange_create_ack_record(self, **kw):
         return self.exchange_create_child_record(
             exc_type=self.type_id.ack_type_id, **kw
@@ -366,6 +788,8 @@ class EDIExchangeRecord(models.Model):
         )
         if self._quick_exec_enabled():
             self._execute_next_action()
+        else:
+            self._schedule_sync()
         return True
 
     def action_regenerate(self):
@@ -484,68 +908,72 @@ class EDIExchangeRecord(models.Model):
 
         if query.is_empty():
             return query
-        orig_ids = list(query)
-        ids = set(orig_ids)
-        result = []
-        model_data = defaultdict(lambda: defaultdict(set))
-        sub_query = """
-            SELECT id, res_id, model
-            FROM %(table)s
-            WHERE id = ANY (%%(ids)s)
-        """
-        for sub_ids in self._cr.split_for_in_conditions(ids):
-            self._cr.execute(
-                sub_query % {"table": self._table},
-                dict(ids=list(sub_ids)),
-            )
-            for eid, res_id, model in self._cr.fetchall():
-                if not model:
-                    result.append(eid)
-                    continue
-                model_data[model][res_id].add(eid)
+        # Filter in SQL so that limit, offset and order are applied by PostgreSQL
+        query.add_where(self._get_related_access_condition(query.table))
+        return query
 
-        for model, targets in model_data.items():
+    @api.model
+    def _get_related_access_condition(self, alias):
+        """SQL condition restricting records to the ones w/ readable documents."""
+        model_column = SQL.identifier(alias, "model")
+        res_id_column = SQL.identifier(alias, "res_id")
+        conditions = [SQL("%s IS NULL", model_column)]
+        # Searching related models can search exchange records again
+        # (eg: exchanges of exchanges, record rules):
+        # skip models already being resolved, or it never ends
+        skipped = self.env.context.get("_edi_access_models", ())
+        for model in self._get_related_models():
+            if model not in self.env or model in skipped:
+                continue
             try:
                 self.env[model].check_access("read")
             except AccessError:  # no read access rights
                 continue
-            recs = self.env[model].browse(list(targets))
-            missing = recs - recs.exists()
-            if missing:
-                for res_id in missing.ids:
-                    _logger.warning(
-                        "Deleted record %s,%s is referenced by edi.exchange.record %s",
-                        model,
-                        res_id,
-                        list(targets[res_id]),
-                    )
-                recs = recs - missing
-            allowed = list(
-                self.env[model]
-                .with_context(active_test=False)
-                ._search([("id", "in", recs.ids)])
+            related_model = self.env[model].with_context(
+                active_test=False, _edi_access_models=skipped + (model,)
+            )
+            allowed = SQL(
+                "%s IN %s", res_id_column, related_model._search([]).subselect()
             )
             if self.env.is_system():
                 # Group "Settings" can list exchanges where record is deleted
-                allowed.extend(missing.ids)
-            for target_id in allowed:
-                result += list(targets[target_id])
-        if len(orig_ids) == limit and len(result) < len(orig_ids):
-            extend_query = self._search(
-                domain,
-                offset=offset + len(orig_ids),
-                limit=limit,
-                order=order,
+                allowed = SQL(
+                    "(%s OR NOT EXISTS (SELECT 1 FROM %s WHERE id = %s))",
+                    allowed,
+                    SQL.identifier(related_model._table),
+                    res_id_column,
+                )
+            conditions.append(SQL("(%s = %s AND %s)", model_column, model, allowed))
+        return SQL("(%s)", SQL(" OR ").join(conditions))
+
+    @api.model
+    def _get_related_models(self):
+        """Distinct models of related documents.
+
+        Skip scan of the `model` index: one lookup per model
+        instead of reading the whole table.
+        """
+        self.flush_model(["model"])
+        self.env.cr.execute(
+            SQL(
+                """
+                WITH RECURSIVE models AS (
+                    (SELECT model FROM %(table)s
+                     WHERE model IS NOT NULL ORDER BY model LIMIT 1)
+                    UNION ALL
+                    SELECT (
+                        SELECT model FROM %(table)s
+                        WHERE model > models.model ORDER BY model LIMIT 1
+                    )
+                    FROM models
+                    WHERE models.model IS NOT NULL
+                )
+                SELECT model FROM models WHERE model IS NOT NULL
+                """,
+                table=SQL.identifier(self._table),
             )
-            extend_ids = list(extend_query)
-            result.extend(extend_ids[: limit - len(result)])
-
-        # Restore original ordering
-        result = [x for x in orig_ids if x in result]
-        if set(orig_ids) != set(result):
-            # Create a virgin query
-            query = self.browse(result)._as_query()
-        return query
+        )
+        return [row[0] for row in self.env.cr.fetchall()]
 
     def read(self, fields=None, load="_classic_read"):
         """Override to explicitely call check_access_rule, that is not called
@@ -559,31 +987,122 @@ class EDIExchangeRecord(models.Model):
         super().check_access(operation)
         if self.env.is_superuser():
             return
-        default_checker = self.env["edi.exchange.consumer.mixin"].get_edi_access
+        mixin = self.env["edi.exchange.consumer.mixin"]
+        default_checker = mixin.get_edi_access
+        access_cache = self._get_access_cache()
+        # Record rules depend on the user, its groups and the allowed companies
+        user_key = (
+            self.env.uid,
+            tuple(self.env.companies.ids),
+            tuple(self.env.user.groups_id.ids),
+        )
         by_model_rec_ids = defaultdict(set)
-        by_model_checker = {}
         for exc_rec in self.sudo():
-            if not exc_rec.related_record_exists:
+            if not exc_rec.model or not exc_rec.res_id:
                 continue
-            by_model_rec_ids[exc_rec.model].add(exc_rec.res_id)
-            if exc_rec.model not in by_model_checker:
-                by_model_checker[exc_rec.model] = getattr(
-                    self.env[exc_rec.model], "get_edi_access", default_checker
-                )
-
+            key = (user_key, exc_rec.model, exc_rec.res_id, operation)
+            if key not in access_cache:
+                by_model_rec_ids[exc_rec.model].add(exc_rec.res_id)
+        # One existence check and one access check per model
         for model, rec_ids in by_model_rec_ids.items():
-            records = self.env[model].browse(rec_ids).with_user(self._uid)
-            checker = by_model_checker[model]
-            for record in records:
-                check_operation = checker(
-                    [record.id], operation, model_name=record._name
+            records = self.env[model].browse(rec_ids).exists()
+            if not records:
+                continue
+            checker = getattr(records, "get_edi_access", default_checker)
+            check_operation = checker(records.ids, operation, model_name=model)
+            records.check_access(check_operation)
+            if isinstance(records, type(mixin)):
+                # Consumers drop cached decisions when written,
+                # see `edi.exchange.consumer.mixin.write`
+                access_cache.update(
+                    (user_key, model, res_id, operation) for res_id in records.ids
                 )
-                record.check_access(check_operation)
+
+    @api.model
+    def _get_access_cache(self):
+        """Access decisions on related documents for current transaction.
+
+        Set of granted `(user key, model, res_id, operation)`.
+        Kept by cursor, it survives flushing savepoints (which run precommit
+        hooks) and is dropped on commit, rollback and rolled back savepoints
+        (which clear precommit hooks w/o running them).
+        """
+        cr = self.env.cr
+        store = _access_caches.get(cr)
+        if store is None:
+            store = _access_caches[cr] = {"cache": set(), "token": object()}
+            drop = partial(_access_caches.pop, cr, None)
+            cr.postcommit.add(drop)
+            cr.postrollback.add(drop)
+        if cr.precommit.data.get("edi_oca.access_cache") is not store["token"]:
+            if store.get("flushed") is not store["token"]:
+                # Precommit data cleared w/o running hooks: savepoint rolled back
+                store["cache"] = set()
+            token = store["token"] = object()
+            cr.precommit.data["edi_oca.access_cache"] = token
+            cr.precommit.add(partial(store.__setitem__, "flushed", token))
+        return store["cache"]
+
+    @api.model
+    def _clear_access_cache(self, model=None):
+        """Forget access decisions on related documents of given model or all."""
+        cache = self._get_access_cache()
+        if model is None:
+            cache.clear()
+            return
+        cache.difference_update([key for key in cache if key[1] == model])
 
     def write(self, vals):
         self.check_access("write")
+        if "edi_exchange_state" in vals:
+            self._log_state_transition(vals["edi_exchange_state"])
         return super().write(vals)
 
+    def _log_state_transition(self, state, date=None, action_duration=None):
+        """Log records moving to given state, for backends w/ `log_transitions`.
+
+        To be called before the state is updated.
+        """
+        if self.env.context.get("edi_transition_logged"):
+            return
+        self.env["edi.exchange.record.transition"].sudo()._log(
+            [
+                (rec.id, rec.edi_exchange_state, state, action_duration)
+                for rec in self
+                if rec.edi_exchange_state != state and rec.backend_id.log_transitions
+            ],
+            date=date,
+        )
+
+    def _write_state_values(self, vals):
+        """Write state related values w/ a single UPDATE.
+
+        Bypass `write` (and its access checks and tracking).
+        Fields depending on the updated ones are recomputed as usual.
+        """
+        fnames = list(vals)
+        if "edi_exchange_state" in vals:
+            self._log_state_transition(vals["edi_exchange_state"])
+        self.flush_recordset(fnames)
+        self.env.cr.execute(
+            SQL(
+                "UPDATE %s SET %s, write_uid = %s, write_date = %s WHERE id IN %s",
+                SQL.identifier(self._table),
+                SQL(", ").join(
+                    SQL("%s = %s", SQL.identifier(fname), value)
+                    for fname, value in vals.items()
+                ),
+                self.env.uid,
+                self.env.cr.now(),
+                tuple(self.ids),
+            )
+        )
+        self.invalidate_recordset(fnames + ["write_uid", "write_date"])
+        self.modified(fnames)
+        if "edi_exchange_state" in vals:
+            # Constraints are not checked w/o `write`
+            self._constrain_edi_exchange_state()
+
     def _job_delay_params(self):
         params = {}
         channel = self.type_id.sudo().job_channel_id
@@ -603,26 +1122,127 @@ class EDIExchangeRecord(models.Model):
         params.update(kw)
         return super().delayable(**params)
 
+    def delay_batch(
+        self, method_name, next_method_name=None, batch_size=None, **job_params
+    ):
+        """Enqueue jobs to run given method for each record.
+
+        Same as calling `delayable` on each record (chaining next method
+        w/ `on_done`) but way faster for many records:
+        existing jobs are looked up w/ a single query
+        and new jobs are inserted all together.
+        Records having a pending job running given method already,
+        on their own or in a batch, are skipped.
+
+        When the exchange type has a `job_batch_size`,
+        records are split in chunks of that size
+        and each chunk is handled by one `action_exchange_batch` job.
+        Methods from `_multi_record_job_methods` get the chunk directly.
+
+        :param method_name: method to run for each record
+        :param next_method_name: method to run w/ max priority for each record
+            once the 1st job is done
+        :param batch_size: override exchange types' `job_batch_size`
+        :param job_params: extra job properties (eg: channel)
+        :return: queue.job recordset of the created jobs
+        """
+        job_model = self.env["queue.job"].sudo()
+        # Chunks change w/ the records to handle: skip records
+        # having a pending job already, alone or in a chunk.
+        records = self - self._get_pending_job_records(method_name)
+        if not records:
+            return job_model
+        chunks = records._get_job_chunks(batch_size=batch_size)
+        if must_run_without_delay(self.env):
+            for chunk in chunks:
+                for rec in chunk:
+                    job = getattr(rec.delayable(**job_params), method_name)()
+                    if next_method_name:
+                        job.on_done(
+                            getattr(rec.delayable(priority=0), next_method_name)()
+                        )
+                    job.delay()
+            return job_model
+        graphs = [
+            chunk._make_job_graph(
+                method_name, next_method_name=next_method_name, **job_params
+            )
+            for chunk in chunks
+        ]
+        vals_list = [job._store_values(create=True) for jobs in graphs for job in jobs]
+        return job_model.with_context(
+            _job_edit_sentinel=job_model.EDIT_SENTINEL
+        ).create(vals_list)
+
+    def _get_job_chunks(self, batch_size=None):
+        chunks = []
+        for exc_type, records in groupby(self, key=lambda x: x.type_id):
+            records = self.browse().concat(*records)
+            size = max(batch_size or exc_type.job_batch_size, 1)
+            chunks.extend(records[i : i + size] for i in range(0, len(records), size))
+        return chunks
+
+    def _make_job_graph(self, method_name, next_method_name=None, **kw):
+        jobs = [self._make_batch_job(method_name, **kw)]
+        if next_method_name:
+            jobs.append(self._make_batch_job(next_method_name, **dict(kw, priority=0)))
+            jobs[1].add_depends({jobs[0]})
+            graph_uuid = str(uuid.uuid4())
+            for job in jobs:
+                job.graph_uuid = graph_uuid
+        return jobs
+
+    def _make_batch_job(self, method_name, **kw):
+        if len(self) > 1 and method_name not in self._multi_record_job_methods:
+            return self._make_job("action_exchange_batch", args=(method_name,), **kw)
+        return self._make_job(method_name, **kw)
+
+    def _make_job(self, method_name, **kw):
+        params = self._job_delay_params()
+        params.update(kw)
+        return Job(getattr(self, method_name), **params)
+
+    def _get_pending_job_records(self, method_name):
+        """Return records having a pending job running given method.
+
+        Jobs running the method for one record
+        and `action_exchange_batch` jobs running it for many are both matched.
+        The current job, if any, is not.
+        """
+        domain = [
+            ("edi_exchange_record_ids", "in", self.ids),
+            ("method_name", "in", [method_name, "action_exchange_batch"]),
+            ("state", "in", [WAIT_DEPENDENCIES, PENDING, ENQUEUED]),
+        ]
+        job_uuid = self.env.context.get("job_uuid")
+        if job_uuid:
+            domain.append(("uuid", "!=", job_uuid))
+        jobs = self.env["queue.job"].sudo().search(domain)
+        jobs = jobs.filtered(
+            lambda x: x.method_name == method_name or x.args[:1] == (method_name,)
+        )
+        return self & jobs.edi_exchange_record_ids
+
     def _job_retry_params(self):
         return {}
 
     def _compute_related_queue_jobs_count(self):
-        for rec in self:
-            # TODO: We should refactor the object field on queue_job to use jsonb field
-            # so that we can search directly into it.
-            rec.related_queue_jobs_count = rec.env["queue.job"].search_count(
-                [("func_string", "like", str(rec))]
+        # Jobs are linked to exchange records when created, see `queue.job.create`
+        counts = dict(
+            self.env["queue.job"]._read_group(
+                [("edi_exchange_record_ids", "in", [_id for _id in self.ids if _id])],
+                ["edi_exchange_record_ids"],
+                ["__count"],
             )
+        )
+        for rec in self:
+            rec.related_queue_jobs_count = counts.get(rec._origin, 0)
 
     def action_view_related_queue_jobs(self):
         self.ensure_one()
         xmlid = "queue_job.action_queue_job"
         action = self.env["ir.actions.act_window"]._for_xml_id(xmlid)
-        # Searching based on task name:
-        # Ex: `edi.exchange.record(1,).action_exchange_send()`
-        # TODO: We should refactor the object field on queue_job to use jsonb field
-        # so that we can search directly into it.
-        action["domain"] = [("func_string", "like", str(self))]
+        action["domain"] = [("edi_exchange_record_ids", "in", self.ids)]
         # Purge default search filters from ctx to avoid hiding records
         ctx = action.get("context", {})
         if isinstance(ctx, str):
@@ -0,0 +1,171 @@
+# Copyright 2026 Camptocamp SA
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+from datetime import timedelta
+
+from odoo import api, fields, models, tools
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+from ..utils import get_worker
+
+
+def _selection_exchange_state(self):
+    return self.env["edi.exchange.record"]._fields["edi_exchange_state"].selection
+
+
+class EDIExchangeRecordTransition(models.Model):
+    """Log of exchange records state transitions.
+
+    Append-only and written w/ plain SQL to stay cheap for high volumes.
+    """
+
+    _name = "edi.exchange.record.transition"
+    _description = "EDI exchange record transition"
+    _order = "date desc, id desc"
+    _log_access = False
+
+    record_id = fields.Many2one(
+        comodel_name="edi.exchange.record",
+        required=True,
+        readonly=True,
+        ondelete="cascade",
+    )
+    backend_id = fields.Many2one(
+        comodel_name="edi.backend",
+        readonly=True,
+        ondelete="cascade",
+    )
+    type_id = fields.Many2one(
+        comodel_name="edi.exchange.type",
+        readonly=True,
+        ondelete="cascade",
+    )
+    from_state = fields.Selection(selection=_selection_exchange_state, readonly=True)
+    to_state = fields.Selection(selection=_selection_exchange_state, readonly=True)
+    date = fields.Datetime(required=True, readonly=True, index=True)
+    duration = fields.Float(
+        readonly=True,
+        help="Seconds spent in the previous state.",
+    )
+    action_duration = fields.Float(
+        readonly=True,
+        help="Seconds spent running the action leading to the new state.",
+    )
+    worker = fields.Char(readonly=True)
+
+    # Days to keep transitions for when not set w/ system parameter
+    _default_retention_days = 90
+
+    def init(self):
+        # Used to find the previous transition of records
+        create_index(
+            self.env.cr,
+            "edi_exchange_record_transition_record_date_index",
+            self._table,
+            ["record_id", "date"],
+        )
+
+    @api.model
+    def _log(self, rows, date=None):
+        """Log transitions w/ a single INSERT.
+
+        :param rows: list of `(record_id, from_state, to_state, action_duration)`
+        :param date: date of the transitions, defaults to now
+        """
+        if not rows:
+            return
+        date = date or fields.Datetime.now()
+        self.env.cr.execute(
+            SQL(
+                """
+                INSERT INTO edi_exchange_record_transition (
+                    record_id, backend_id, type_id, from_state, to_state,
+                    date, duration, action_duration, worker
+                )
+                SELECT
+                    rec.id, rec.backend_id, rec.type_id, v.from_state, v.to_state,
+                    %(date)s,
+                    EXTRACT(EPOCH FROM %(date)s - COALESCE(prev.date, rec.create_date)),
+                    v.action_duration,
+                    %(worker)s
+                FROM (VALUES %(values)s) AS v(id, from_state, to_state, action_duration)
+                JOIN edi_exchange_record rec ON rec.id = v.id
+                LEFT JOIN LATERAL (
+                    SELECT max(date) AS date
+                    FROM edi_exchange_record_transition
+                    WHERE record_id = rec.id
+                ) prev ON TRUE
+                """,
+                date=date,
+                worker=get_worker(),
+                values=SQL(", ").join(
+                    SQL("(%s, %s, %s, %s::float)", *row) for row in rows
+                ),
+            )
+        )
+
+    @api.autovacuum
+    def _gc_transitions(self):
+        days = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param(
+                "edi_oca.transition_log_retention_days", self._default_retention_days
+            )
+        )
+        limit = fields.Datetime.now() - timedelta(days=days)
+        self.env.cr.execute(
+            SQL("DELETE FROM edi_exchange_record_transition WHERE date < %s", limit)
+        )
+
+
+class EDIExchangeRecordTransitionStats(models.Model):
+    """Latency of exchange records per backend, type and state transition."""
+
+    _name = "edi.exchange.record.transition.stats"
+    _description = "EDI exchange record transition statistics"
+    _auto = False
+    _order = "day desc"
+
+    day = fields.Date(readonly=True)
+    backend_id = fields.Many2one(comodel_name="edi.backend", readonly=True)
+    type_id = fields.Many2one(comodel_name="edi.exchange.type", readonly=True)
+    from_state = fields.Selection(selection=_selection_exchange_state, readonly=True)
+    to_state = fields.Selection(selection=_selection_exchange_state, readonly=True)
+    count = fields.Integer(readonly=True)
+    # Percentiles cannot be summed up: show the worst one when grouping
+    duration_p50 = fields.Float(readonly=True, aggregator="max")
+    duration_p95 = fields.Float(readonly=True, aggregator="max")
+    action_duration_p50 = fields.Float(readonly=True, aggregator="max")
+    action_duration_p95 = fields.Float(readonly=True, aggregator="max")
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(
+            SQL(
+                """
+                CREATE OR REPLACE VIEW %s AS (
+                    SELECT
+                        row_number() OVER () AS id,
+                        date::date AS day,
+                        backend_id,
+                        type_id,
+                        from_state,
+                        to_state,
+                        count(*) AS count,
+                        percentile_cont(0.5) WITHIN GROUP (ORDER BY duration)
+                            AS duration_p50,
+                        percentile_cont(0.95) WITHIN GROUP (ORDER BY duration)
+                            AS duration_p95,
+                        percentile_cont(0.5) WITHIN GROUP (ORDER BY action_duration)
+                            AS action_duration_p50,
+                        percentile_cont(0.95) WITHIN GROUP (ORDER BY action_duration)
+                            AS action_duration_p95
+                    FROM edi_exchange_record_transition
+                    GROUP BY date::date, backend_id, type_id, from_state, to_state
+                )
+                """,
+                SQL.identifier(self._table),
+            )
+        )
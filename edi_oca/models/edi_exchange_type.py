@@ -2,12 +2,13 @@
 # Copyright 2021 Camptocamp SA
 # @author Simone Orsi <simahawk@gmail.com>
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+import copy
 import logging
 from datetime import datetime
 
 from pytz import timezone, utc
 
-from odoo import _, api, exceptions, fields, models
+from odoo import _, api, exceptions, fields, models, tools
 from odoo.tools import DEFAULT_SERVER_DATETIME_FORMAT as DATETIME_FORMAT
 from odoo.tools import groupby
 
@@ -18,6 +19,9 @@ _logger = logging.getLogger(__name__)
 
 try:
     import yaml
+
+    # Prefer libyaml bindings when available: way faster
+    YAMLSafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 except ImportError:
     _logger.debug("`yaml` lib is missing")
 
@@ -45,6 +49,10 @@ class EDIExchangeType(models.Model):
     job_channel_id = fields.Many2one(
         comodel_name="queue.job.channel",
     )
+    job_batch_size = fields.Integer(
+        help="When greater than 1, sync jobs will handle up to this number "
+        "of exchange records at once instead of running one job per record.",
+    )
     name = fields.Char(required=True)
     code = fields.Char(required=True, copy=False)
     direction = fields.Selection(
@@ -130,6 +138,10 @@ class EDIExchangeType(models.Model):
         inverse_name="type_id",
         help="Rules to handle exchanges and UI automatically",
     )
+    bulk_state_update = fields.Boolean(
+        help="Update records state w/ plain SQL. "
+        "Faster for high volumes but `write` overrides and tracking are skipped.",
+    )
     quick_exec = fields.Boolean(
         string="Quick execution",
         help="When active, records of this type will be processed immediately "
@@ -205,10 +217,80 @@ class EDIExchangeType(models.Model):
             rec.advanced_settings = rec._load_advanced_settings()
 
     def _load_advanced_settings(self):
-        # TODO: validate settings w/ a schema.
-        # Could be done w/ Cerberus or JSON-schema.
-        # This would help documenting core and custom keys.
-        return yaml.safe_load(self.advanced_settings_edit or "") or {}
+        """Return parsed advanced settings.
+
+        Parsing is cached and shared by all the types having the same settings:
+        return a copy, callers (eg: components) are free to modify it.
+        """
+        return copy.deepcopy(
+            self._parse_advanced_settings(self.advanced_settings_edit or "")
+        )
+
+    @api.model
+    @tools.ormcache("settings_edit")
+    def _parse_advanced_settings(self, settings_edit):
+        return yaml.load(settings_edit, Loader=YAMLSafeLoader) or {}
+
+    @api.constrains("advanced_settings_edit")
+    def _check_advanced_settings(self):
+        for rec in self:
+            try:
+                settings = rec._load_advanced_settings()
+            except yaml.YAMLError as err:
+                raise exceptions.ValidationError(
+                    _("Advanced settings are not valid YAML: %s") % err
+                ) from err
+            error = rec._validate_advanced_settings(settings)
+            if error:
+                raise exceptions.ValidationError(
+                    _("Advanced settings are not valid: %s") % error
+                )
+
+    # Value type for known settings keys
+    _advanced_settings_schema = {
+        "components": dict,
+        "filename_pattern": dict,
+    }
+    _advanced_settings_component_schema = {
+        "usage": str,
+        "env_ctx": dict,
+        "work_ctx": dict,
+    }
+    _advanced_settings_component_actions = (
+        "generate",
+        "validate",
+        "check",
+        "send",
+        "receive",
+        "process",
+    )
+
+    def _validate_advanced_settings(self, settings):
+        """Validate settings structure for known keys.
+
+        Unknown keys are left alone as they can be used for custom needs.
+
+        :return: error message if any
+        """
+        if not isinstance(settings, dict):
+            return _("settings must be a dictionary")
+        for key, value_type in self._advanced_settings_schema.items():
+            if key in settings and not isinstance(settings[key], value_type):
+                return _("`%s` must be a dictionary") % key
+        components = settings.get("components", {})
+        for action in self._advanced_settings_component_actions:
+            conf = components.get(action)
+            if conf is None:
+                continue
+            if not isinstance(conf, dict):
+                return _("`components.%s` must be a dictionary") % action
+            for key, value_type in self._advanced_settings_component_schema.items():
+                if key in conf and not isinstance(conf[key], value_type):
+                    return _("`components.%(action)s.%(key)s` has a wrong type") % {
+                        "action": action,
+                        "key": key,
+                    }
+        return None
 
     def _compute_ack_for_type_ids(self):
         ack_for = self.search([("ack_type_id", "in", self.ids)])
@@ -217,7 +299,7 @@ class EDIExchangeType(models.Model):
             rec.ack_for_type_ids = [x.id for x in by_type_id.get(rec.id, [])]
 
     def get_settings(self):
-        return self.advanced_settings
+        return self._load_advanced_settings()
 
     def set_settings(self, val):
         self.advanced_settings_edit = val
@@ -241,7 +323,7 @@ class EDIExchangeType(models.Model):
             date_pattern: %Y-%m-%d-%H-%M-%S
         """
         self.ensure_one()
-        pattern_settings = self.advanced_settings.get("filename_pattern", {})
+        pattern_settings = self.get_settings().get("filename_pattern", {})
         force_tz = pattern_settings.get("force_tz", self.env.user.tz)
         date_pattern = pattern_settings.get("date_pattern", DATETIME_FORMAT)
         tz = timezone(force_tz) if force_tz else None
@@ -256,13 +338,17 @@ class EDIExchangeType(models.Model):
             else ""
         )
 
-    def _make_exchange_filename(self, exchange_record):
-        """Generate filename."""
+    def _make_exchange_filename(self, exchange_record, dt=None):
+        """Generate filename.
+
+        :param exchange_record: edi.exchange.record recordset
+        :param dt: datetime string to use, computed if not given
+        """
         pattern = self.exchange_filename_pattern
         ext = self.exchange_file_ext
         if ext:
             pattern += ".{ext}"
-        dt = self._make_exchange_filename_datetime()
+        dt = dt or self._make_exchange_filename_datetime()
         seq = self._make_exchange_filename_sequence()
         record_name = self._get_record_name(exchange_record)
         record = exchange_record
@@ -0,0 +1,24 @@
+# Copyright 2026 Camptocamp SA
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+from odoo import api, models
+
+
+class IrModelAccess(models.Model):
+    _inherit = "ir.model.access"
+
+    # Exchange records access decisions are cached for the transaction:
+    # see `edi.exchange.record._get_access_cache`
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env["edi.exchange.record"]._clear_access_cache()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self.env["edi.exchange.record"]._clear_access_cache()
+        return super().write(vals)
+
+    def unlink(self):
+        self.env["edi.exchange.record"]._clear_access_cache()
+        return super().unlink()
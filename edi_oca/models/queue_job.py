@@ -0,0 +1,42 @@
+# Copyright 2026 Camptocamp SA
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+from odoo import Command, api, fields, models
+
+
+class QueueJob(models.Model):
+    _inherit = "queue.job"
+
+    edi_exchange_record_ids = fields.Many2many(
+        string="EDI exchange records",
+        comodel_name="edi.exchange.record",
+        relation="edi_exchange_record_queue_job_rel",
+        column1="job_id",
+        column2="exchange_record_id",
+        readonly=True,
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            exchange_records = self._get_edi_exchange_records(vals)
+            if exchange_records:
+                vals["edi_exchange_record_ids"] = [Command.set(exchange_records.ids)]
+        return super().create(vals_list)
+
+    def _get_edi_exchange_records(self, vals):
+        """Exchange records the job runs on or receives as arguments."""
+        record_model = self.env["edi.exchange.record"]
+        candidates = [
+            vals.get("records"),
+            *(vals.get("args") or ()),
+            *(vals.get("kwargs") or {}).values(),
+        ]
+        return record_model.concat(
+            *(
+                value
+                for value in candidates
+                if isinstance(value, models.BaseModel)
+                and value._name == record_model._name
+            )
+        )
@@ -0,0 +1,18 @@
+# Copyright 2026 Camptocamp SA
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+from odoo import models
+
+
+class ResUsers(models.Model):
+    _inherit = "res.users"
+
+    def write(self, vals):
+        if any(
+            fname == "groups_id" or fname.startswith(("in_group_", "sel_groups_"))
+            for fname in vals
+        ):
+            # Exchange records access decisions are cached for the transaction:
+            # see `edi.exchange.record._get_access_cache`
+            self.env["edi.exchange.record"]._clear_access_cache()
+        return super().write(vals)
@@ -2,6 +2,8 @@
 # @author: Simone Orsi <simahawk@gmail.com>
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 
+from unittest import mock
+
 from freezegun import freeze_time
 
 from .common import EDIBackendCommonTestCase
@@ -26,6 +28,40 @@ class EDIBackendTestCaseBase(EDIBackendCommonTestCase):
         self.assertEqual(record.record, self.partner)
         self.assertEqual(record.edi_exchange_state, "new")
 
+    @freeze_time("2020-10-21 10:00:00")
+    def test_create_records(self):
+        self.env.user.tz = None  # Have no timezone used in generated filename
+        partner2 = self.partner.copy({"ref": "EDI_EXC_TEST2"})
+        vals_list = [
+            {"model": self.partner._name, "res_id": self.partner.id},
+            {"model": partner2._name, "res_id": partner2.id},
+        ]
+        records = self.backend.create_records("test_csv_input", vals_list)
+        expected = {
+            "type_id": self.exchange_type_in.id,
+            "backend_id": self.backend.id,
+            "edi_exchange_state": "new",
+        }
+        self.assertRecordValues(
+            records,
+            [
+                dict(
+                    expected,
+                    exchange_filename="EDI_EXC_TEST-test_csv_"
+                    "input-2020-10-21-10-00-00.csv",
+                ),
+                dict(
+                    expected,
+                    exchange_filename="EDI_EXC_TEST2-test_csv_"
+                    "input-2020-10-21-10-00-00.csv",
+                ),
+            ],
+        )
+        self.assertEqual([x.record for x in records], [self.partner, partner2])
+        self.assertEqual(len(set(records.mapped("identifier"))), 2)
+        # Original values are not touched
+        self.assertNotIn("type_id", vals_list[0])
+
     def test_get_component_usage(self):
         vals = {
             "model": self.partner._name,
@@ -63,6 +99,57 @@ class EDIBackendTestCaseBase(EDIBackendCommonTestCase):
             ["my.special.send", "output.send"],
         )
 
+    def test_action_plan(self):
+        vals = {
+            "model": self.partner._name,
+            "res_id": self.partner.id,
+        }
+        record = self.backend.create_record("test_csv_output", vals)
+        plan = self.backend._get_action_plan(record, "generate")
+        self.assertEqual(plan.usage_candidates, ("output.generate",))
+        self.assertEqual(dict(plan.env_ctx), {"edi_framework_action": "generate"})
+        self.assertEqual(
+            dict(plan.match_attrs),
+            {
+                "backend_type": self.backend_type_code,
+                "exchange_type": "test_csv_output",
+            },
+        )
+        # Same plan for any record of the same type
+        record2 = self.backend.create_record("test_csv_output", vals)
+        self.assertIs(self.backend._get_action_plan(record2, "generate"), plan)
+        # Changing the type drops the plan
+        record.type_id.advanced_settings_edit = """
+        components:
+            generate:
+                usage: my.special.generate
+                env_ctx:
+                    opt1: True
+                work_ctx:
+                    opt2: False
+        """
+        plan = self.backend._get_action_plan(record, "generate")
+        self.assertEqual(
+            plan.usage_candidates, ("my.special.generate", "output.generate")
+        )
+        self.assertEqual(
+            dict(plan.env_ctx), {"opt1": True, "edi_framework_action": "generate"}
+        )
+        self.assertEqual(dict(plan.work_ctx), {"opt2": False})
+        # Usages depend on the direction
+        record.type_id.direction = "input"
+        plan = self.backend._get_action_plan(record, "generate")
+        self.assertEqual(
+            plan.usage_candidates, ("my.special.generate", "input.generate")
+        )
+        # Plans depending on other values can opt out from caching
+        with mock.patch.object(
+            type(self.backend), "_get_action_plan_key", return_value=None
+        ):
+            other_plan = self.backend._get_action_plan(record, "generate")
+        self.assertEqual(other_plan, plan)
+        self.assertIsNot(other_plan, plan)
+
     def test_action_view_exchanges(self):
         # Just testing is not broken
         self.assertTrue(self.backend.action_view_exchanges())
@@ -6,7 +6,8 @@ from unittest import mock
 
 from requests.exceptions import ConnectionError as ReqConnectionError
 
-from odoo.addons.queue_job.exception import RetryableJobError
+from odoo.addons.queue_job.exception import FailedJobError, RetryableJobError
+from odoo.addons.queue_job.job import Job
 from odoo.addons.queue_job.tests.common import JobMixin
 
 from .common import EDIBackendCommonTestCase
@@ -39,6 +40,8 @@ class EDIBackendTestJobsCase(EDIBackendCommonTestCase, JobMixin):
         )
         # Check related jobs
         self.assertEqual(created, self._get_related_jobs(record))
+        self.assertEqual(record.queue_job_ids, created)
+        self.assertEqual(record.related_queue_jobs_count, 1)
         with (
             mock.patch.object(
                 type(self.backend), "_exchange_generate"
@@ -78,6 +81,38 @@ class EDIBackendTestJobsCase(EDIBackendCommonTestCase, JobMixin):
             with self.assertRaises(RetryableJobError):
                 job.perform()
 
+    def test_output_batch_retry(self):
+        vals = {
+            "model": self.partner._name,
+            "res_id": self.partner.id,
+            "edi_exchange_state": "output_pending",
+        }
+        records = self.backend.create_records("test_csv_output", [vals] * 2)
+        for rec in records:
+            rec._set_file_content("ABC")
+        job = records.with_delay().action_exchange_batch("action_exchange_send")
+        job_counter = self.job_counter()
+        with mock.patch.object(type(self.backend), "_exchange_send") as mocked:
+            mocked.side_effect = ReqConnectionError("Connection broken")
+            report = job.perform()
+            self.assertIn("retry delayed", report)
+            # Each record gets its own job, postponed and counting this attempt
+            created = job_counter.search_created()
+            self.assertEqual(len(created), 2)
+            self.assertEqual(created.records, records)
+            self.assertEqual(
+                set(created.mapped("method_name")), {"action_exchange_send"}
+            )
+            self.assertEqual(created.mapped("retry"), [1, 1])
+            self.assertTrue(all(created.mapped("eta")))
+            # No retry left: no record succeeded, the job fails
+            job.db_record().retry = job.max_retries - 1
+            job = Job.load(self.env, job.uuid)
+            with self.assertRaises(FailedJobError) as err:
+                job.perform()
+            self.assertIn("max. retries reached", err.exception.args[0])
+        self.assertEqual(job_counter.search_created(), created)
+
     def test_input(self):
         job_counter = self.job_counter()
         vals = {
@@ -91,6 +126,8 @@ class EDIBackendTestJobsCase(EDIBackendCommonTestCase, JobMixin):
         self.assertEqual(created.name, "Retrieve an incoming document.")
         # Check related jobs
         self.assertEqual(created, self._get_related_jobs(record))
+        self.assertEqual(record.queue_job_ids, created)
+        self.assertEqual(record.related_queue_jobs_count, 1)
         with (
             mock.patch.object(
                 type(self.backend), "_exchange_receive"
@@ -134,3 +171,143 @@ class EDIBackendTestJobsCase(EDIBackendCommonTestCase, JobMixin):
         # Check related jobs
         record.invalidate_recordset()
         self.assertEqual(created, self._get_related_jobs(record))
+
+    def test_output_sync_jobs_batch(self):
+        self.exchange_type_out.exchange_file_auto_generate = True
+        records = self.backend.create_records(
+            "test_csv_output",
+            [
+                {"model": self.partner._name, "res_id": self.partner.id},
+                {"model": self.partner._name, "res_id": self.partner.id},
+            ],
+        )
+        job_counter = self.job_counter()
+        self.backend._check_output_exchange_sync(record_ids=records.ids)
+        created = job_counter.search_created()
+        # 1 generate job + 1 send job waiting for it, per record
+        self.assertEqual(len(created), 4)
+        for record in records:
+            jobs = self._get_related_jobs(record)
+            self.assertEqual(
+                sorted(jobs.mapped("method_name")),
+                ["action_exchange_generate", "action_exchange_send"],
+            )
+            generate = jobs.filtered(
+                lambda x: x.method_name == "action_exchange_generate"
+            )
+            send = jobs - generate
+            self.assertEqual(generate.state, "pending")
+            self.assertEqual(send.state, "wait_dependencies")
+            self.assertEqual(send.priority, 0)
+            self.assertEqual(send.graph_uuid, generate.graph_uuid)
+            self.assertEqual(
+                send.dependencies["depends_on"],
+                [generate.uuid],
+            )
+        # Jobs exist already: nothing new
+        self.backend._check_output_exchange_sync(record_ids=records.ids)
+        self.assertEqual(job_counter.search_created(), created)
+
+    def test_output_sync_jobs_batch_size(self):
+        self.exchange_type_out.write(
+            {"exchange_file_auto_generate": True, "job_batch_size": 2}
+        )
+        vals = {"model": self.partner._name, "res_id": self.partner.id}
+        records = self.backend.create_records("test_csv_output", [vals] * 3)
+        job_counter = self.job_counter()
+        self.backend._check_output_exchange_sync(record_ids=records.ids)
+        created = job_counter.search_created()
+        # 1 batch of 2 records + 1 single record, each w/ generate and send jobs
+        self.assertEqual(len(created), 4)
+        batch_jobs = created.filtered(
+            lambda x: x.method_name == "action_exchange_batch"
+        )
+        self.assertEqual(len(batch_jobs), 2)
+        self.assertEqual(
+            sorted(batch_jobs.mapped(lambda x: x.args[0])),
+            ["action_exchange_generate", "action_exchange_send"],
+        )
+        for job in batch_jobs:
+            self.assertEqual(job.records, records[:2])
+        single_jobs = created - batch_jobs
+        self.assertEqual(
+            sorted(single_jobs.mapped("method_name")),
+            ["action_exchange_generate", "action_exchange_send"],
+        )
+        self.assertEqual(single_jobs.records, records[2])
+        # Batch jobs are related to each record of the batch
+        self.assertEqual(records[0].queue_job_ids, batch_jobs)
+        self.assertEqual(records[2].queue_job_ids, single_jobs)
+        self.assertEqual(records.mapped("related_queue_jobs_count"), [2, 2, 2])
+        # Jobs exist already: nothing new
+        self.backend._check_output_exchange_sync(record_ids=records.ids)
+        self.assertEqual(job_counter.search_created(), created)
+
+    def test_output_check_jobs_batch(self):
+        channel = self.env["queue.job.channel"].create(
+            {
+                "name": "edi_check",
+                "parent_id": self.env.ref("edi_oca.channel_edi_root").id,
+            }
+        )
+        self.backend.write({"check_batch_size": 2, "check_job_channel_id": channel.id})
+        vals = {
+            "model": self.partner._name,
+            "res_id": self.partner.id,
+            "edi_exchange_state": "output_sent_and_error",
+        }
+        records = self.backend.create_records("test_csv_output", [vals] * 3)
+        job_counter = self.job_counter()
+        self.backend._check_output_exchange_sync(record_ids=records.ids)
+        created = job_counter.search_created()
+        self.assertEqual(len(created), 2)
+        self.assertEqual(set(created.mapped("method_name")), {"action_exchange_check"})
+        self.assertEqual(set(created.mapped("channel")), {"root.edi.edi_check"})
+        self.assertEqual(created.mapped("records"), records)
+        self.assertEqual(
+            sorted(len(job.records) for job in created),
+            [1, 2],
+        )
+
+    def test_output_check_jobs_batch_pending(self):
+        self.backend.check_batch_size = 2
+        vals = {
+            "model": self.partner._name,
+            "res_id": self.partner.id,
+            "edi_exchange_state": "output_sent_and_error",
+        }
+        records = self.backend.create_records("test_csv_output", [vals] * 3)
+        job_counter = self.job_counter()
+        self.backend._check_output_exchange_sync(record_ids=records[1:].ids)
+        created = job_counter.search_created()
+        self.assertEqual(len(created), 1)
+        self.assertEqual(created.records, records[1:])
+        # Chunks move: only the record w/o pending check job is enqueued
+        self.backend._check_output_exchange_sync(record_ids=records.ids)
+        created = job_counter.search_created() - created
+        self.assertEqual(len(created), 1)
+        self.assertEqual(created.records, records[0])
+        self.assertEqual(records[0].queue_job_ids, created)
+
+    def test_output_sync_jobs_batch_pending(self):
+        self.exchange_type_out.write(
+            {"exchange_file_auto_generate": True, "job_batch_size": 2}
+        )
+        vals = {"model": self.partner._name, "res_id": self.partner.id}
+        records = self.backend.create_records("test_csv_output", [vals] * 3)
+        job_counter = self.job_counter()
+        # Eg: quick exec of a single record
+        self.backend._check_output_exchange_sync(record_ids=records[0].ids)
+        single_jobs = job_counter.search_created()
+        self.assertEqual(len(single_jobs), 2)
+        # The record is not batched w/ the others while its jobs are pending
+        self.backend._check_output_exchange_sync(record_ids=records.ids)
+        batch_jobs = job_counter.search_created() - single_jobs
+        self.assertEqual(
+            set(batch_jobs.mapped("method_name")), {"action_exchange_batch"}
+        )
+        self.assertEqual(batch_jobs.records, records[1:])
+        self.assertEqual(records[0].queue_job_ids, single_jobs)
+        # Batched records do not get single jobs either
+        self.backend._check_output_exchange_sync(record_ids=records[2].ids)
+        self.assertEqual(job_counter.search_created(), single_jobs | batch_jobs)
@@ -10,8 +10,10 @@ from freezegun import freeze_time
 from odoo import fields, tools
 from odoo.exceptions import UserError
 
+from odoo.addons.queue_job.exception import FailedJobError
 from odoo.addons.queue_job.tests.common import trap_jobs
 
+from ..components.base_output import EDIBackendCheckComponentMixin
 from .common import EDIBackendCommonComponentRegistryTestCase
 from .fake_components import FakeOutputChecker, FakeOutputGenerator, FakeOutputSender
 
@@ -109,6 +111,84 @@ class EDIBackendTestOutputCase(EDIBackendCommonComponentRegistryTestCase):
             )
             mocked.assert_not_called()
 
+    def test_send_batch(self):
+        vals = {
+            "model": self.partner._name,
+            "res_id": self.partner.id,
+        }
+        records = self.record | self.backend.create_records(
+            "test_csv_output", [vals, vals]
+        )
+        ok_records = records[:2]
+        for rec in ok_records:
+            rec.write({"edi_exchange_state": "output_pending"})
+            rec._set_file_content(f"TEST {rec.id}")
+        # Last record has no file: it must fail w/o affecting the others
+        report = records.action_exchange_batch("action_exchange_send")
+        for rec in ok_records:
+            self.assertTrue(FakeOutputSender.check_called_for(rec))
+            self.assertEqual(rec.edi_exchange_state, "output_sent")
+            self.assertIn(f"{rec.identifier}: output_sent", report)
+        self.assertEqual(records[2].edi_exchange_state, "new")
+        self.assertIn(f"{records[2].identifier}: new failed:", report)
+        self.assertIn("has no file to send", report)
+
+    def test_send_batch_all_failed(self):
+        vals = {
+            "model": self.partner._name,
+            "res_id": self.partner.id,
+        }
+        records = self.record | self.backend.create_record("test_csv_output", vals)
+        # No record has a file: the job must fail
+        with self.assertRaises(FailedJobError) as err:
+            records.action_exchange_batch("action_exchange_send")
+        self.assertIn("has no file to send", err.exception.args[0])
+
+    def test_check_many(self):
+        vals = {
+            "model": self.partner._name,
+            "res_id": self.partner.id,
+        }
+        records = self.record | self.backend.create_records(
+            "test_csv_output", [vals, vals]
+        )
+        records.write({"edi_exchange_state": "output_sent_and_error"})
+        check_many = EDIBackendCheckComponentMixin.check_many
+        with mock.patch.object(
+            EDIBackendCheckComponentMixin,
+            "check_many",
+            autospec=True,
+            side_effect=check_many,
+        ) as mocked:
+            results = records.action_exchange_check()
+        self.assertEqual(sorted(results), sorted(records.ids))
+        for rec in records:
+            self.assertTrue(FakeOutputChecker.check_called_for(rec))
+        # The component is not bound to the 1st record of the batch
+        component, exchange_records = mocked.call_args.args
+        self.assertEqual(exchange_records, records)
+        self.assertFalse(component.exchange_record)
+        self.assertIsNone(component.record)
+
+    def test_check_many_legacy_component(self):
+        # Check components w/o `check_many` check records one by one
+        component = mock.Mock(spec=["check"])
+        component.check.return_value = "checked"
+        records = self.record | self.backend.create_record(
+            "test_csv_output",
+            {"model": self.partner._name, "res_id": self.partner.id},
+        )
+        with mock.patch.object(
+            type(self.backend), "_get_component", return_value=component
+        ):
+            results = self.backend._exchange_output_check_state_many(records)
+        self.assertEqual(results, dict.fromkeys(records.ids, "checked"))
+        self.assertEqual(component.check.call_count, 2)
+
+    def test_batch_invalid_method(self):
+        with self.assertRaises(UserError):
+            self.record.action_exchange_batch("unlink")
+
 
 class EDIBackendTestOutputJobsCase(EDIBackendCommonComponentRegistryTestCase):
     @classmethod
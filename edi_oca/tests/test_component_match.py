@@ -2,7 +2,9 @@
 # @author: Simone Orsi <simahawk@gmail.com>
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 
-from odoo.addons.component.core import Component
+from unittest import mock
+
+from odoo.addons.component.core import Component, WorkContext
 
 from .common import EDIBackendCommonComponentRegistryTestCase
 
@@ -69,3 +71,49 @@ class EDIBackendTestMatchCase(EDIBackendCommonComponentRegistryTestCase):
             exchange_type="test_csv_output",
         )
         self.assertEqual(component._name, MatchByExchangeTypeOnly._name)
+
+    def test_component_lookup_cached(self):
+        class MatchByBackendExchangeType(Component):
+            _name = "backend_type.and.exchange_type.cached"
+            _inherit = "edi.component.mixin"
+            _usage = "generate.cached"
+            _backend_type = "demo_backend"
+            _exchange_type = "test_csv_output"
+            _apply_on = ["res.partner"]
+
+        self._build_components(MatchByBackendExchangeType)
+        work_ctx = {"exchange_record": self.env["edi.exchange.record"].browse()}
+        with mock.patch.object(
+            WorkContext,
+            "_matching_components",
+            autospec=True,
+            side_effect=WorkContext._matching_components,
+        ) as mocked:
+            for __ in range(3):
+                component = self.backend._find_component(
+                    "res.partner",
+                    ["generate.cached"],
+                    work_ctx=dict(work_ctx),
+                    backend_type="demo_backend",
+                    exchange_type="test_csv_output",
+                )
+                self.assertEqual(component._name, MatchByBackendExchangeType._name)
+            # Registry scanned only once
+            self.assertEqual(mocked.call_count, 1)
+            # Each component gets its own work context
+            other = self.backend._find_component(
+                "res.partner",
+                ["generate.cached"],
+                work_ctx=dict(work_ctx),
+                backend_type="demo_backend",
+                exchange_type="test_csv_output",
+            )
+            self.assertIsNot(other.work, component.work)
+            # Different match attributes, new lookup
+            self.backend._find_component(
+                "res.partner",
+                ["generate.cached"],
+                work_ctx=dict(work_ctx),
+                backend_type="demo_backend",
+            )
+            self.assertEqual(mocked.call_count, 2)
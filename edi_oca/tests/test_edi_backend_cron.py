@@ -2,7 +2,16 @@
 # @author: Simone Orsi <simahawk@gmail.com>
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 
-from odoo.tools import mute_logger
+import contextlib
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from odoo import fields
+from odoo.tools import config, mute_logger
+
+from odoo.addons.queue_job.controllers.main import _prevent_commit
+from odoo.addons.queue_job.tests.common import trap_jobs
 
 from .common import EDIBackendCommonComponentRegistryTestCase
 from .fake_components import FakeOutputChecker, FakeOutputGenerator, FakeOutputSender
@@ -92,3 +101,171 @@ class EDIBackendTestCronCase(EDIBackendCommonComponentRegistryTestCase):
         self.assertTrue(FakeOutputGenerator.check_not_called_for(self.record1))
         self.assertTrue(FakeOutputSender.check_not_called_for(self.record1))
         self.assertTrue(FakeOutputChecker.check_called_for(self.record1))
+
+    @mute_logger(*LOGGERS)
+    def test_exchange_sync_chunked(self):
+        self.exchange_type_out.exchange_file_auto_generate = True
+        self.backend.sync_chunk_size = 2
+        backend_cls = type(self.backend)
+        with (
+            # Time is over after the 1st chunk
+            mock.patch.object(backend_cls, "_sync_cron_time_budget", -1),
+            mock.patch.object(backend_cls, "_sync_cron_trigger") as mocked,
+        ):
+            self.backend._cron_check_output_exchange_sync(skip_send=True)
+            mocked.assert_called_once_with("output")
+            self.assertEqual(self.backend.output_sync_cursor, self.record2.id)
+            for rec in self.record1 + self.record2:
+                self.assertEqual(rec.edi_exchange_state, "output_pending")
+            self.assertEqual(self.record3.edi_exchange_state, "new")
+            mocked.reset_mock()
+            # Next run resumes from the cursor
+            self.backend._cron_check_output_exchange_sync(skip_send=True)
+            mocked.assert_not_called()
+        self.assertEqual(self.backend.output_sync_cursor, 0)
+        self.assertEqual(self.record3.edi_exchange_state, "output_pending")
+        self.assertTrue(FakeOutputGenerator.check_called_for(self.record3))
+        self.assertEqual(len(FakeOutputGenerator.FAKED_COLLECTOR), 3)
+
+    def test_exchange_sync_time_budget(self):
+        options = {"limit_time_real": 120, "limit_time_real_cron": -1}
+        with mock.patch.dict(config.options, options):
+            # Bounded by the time limit of workers
+            self.assertEqual(self.backend._get_sync_time_budget(), 60)
+            self.assertEqual(self.backend._get_sync_time_budget(cron=True), 60)
+            config.options["limit_time_real_cron"] = 0
+            self.assertEqual(self.backend._get_sync_time_budget(cron=True), 300)
+            config.options["limit_time_real_cron"] = 100
+            self.assertEqual(self.backend._get_sync_time_budget(cron=True), 50)
+            self.assertEqual(self.backend._get_sync_time_budget(), 60)
+
+    @mute_logger(*LOGGERS)
+    def test_exchange_sync_job_chunked(self):
+        self.exchange_type_out.exchange_file_auto_generate = True
+        self.backend.sync_chunk_size = 2
+        backend = self.backend.with_context(queue_job__no_delay=False)
+        job = backend._delay_exchange_sync_job("output", skip_send=True)
+        # As the job runner does
+        job.set_started()
+        job.store()
+        with (
+            # Go through the commit path: commits are forbidden in jobs
+            mock.patch.object(threading.current_thread(), "testing", False),
+            _prevent_commit(self.env.cr),
+            # Time is over after the 1st chunk
+            mock.patch.object(type(self.backend), "_sync_cron_time_budget", -1),
+        ):
+            res = job.perform()
+        self.assertEqual(res, "Time is over, sync continues in a new job.")
+        self.assertEqual(self.backend.output_sync_cursor, self.record2.id)
+        next_job = self.env["queue.job"].search(
+            [
+                ("method_name", "=", "_check_exchange_sync_job"),
+                ("state", "=", "pending"),
+            ]
+        )
+        self.assertEqual(len(next_job), 1)
+        self.assertEqual(next_job.records, self.backend)
+
+    def test_exchange_sync_jobs_per_backend(self):
+        backend2 = self.backend.copy()
+        backends = (self.backend | backend2).with_context(queue_job__no_delay=False)
+        with trap_jobs() as trap:
+            backends._cron_check_output_exchange_sync(skip_send=True)
+            trap.assert_jobs_count(2)
+            for backend in backends:
+                trap.assert_enqueued_job(
+                    backend._check_exchange_sync_job,
+                    args=("output",),
+                    kwargs={"skip_send": True},
+                    properties={"channel": "root.edi.edi_sync"},
+                )
+            # Scans pending already: nothing new
+            backends._cron_check_output_exchange_sync(skip_send=True)
+            trap.assert_jobs_count(2)
+        self.exchange_type_out.exchange_file_auto_generate = True
+        self.backend._check_exchange_sync_job("output", skip_send=True)
+        for rec in self.records:
+            self.assertEqual(rec.edi_exchange_state, "output_pending")
+
+    def _get_sync_triggers(self, direction):
+        cron = self.backend._get_sync_cron(direction, pending_only=True)
+        return self.env["ir.cron.trigger"].search([("cron_id", "=", cron.id)])
+
+    def _get_sync_requests(self):
+        return self.env["edi.backend.sync.request"].search([])
+
+    def _run_postcommit(self):
+        # Crons are triggered from a new cursor, use the test one instead
+        with mock.patch.object(
+            type(self.env.registry),
+            "cursor",
+            return_value=contextlib.nullcontext(self.env.cr),
+        ):
+            self.env.cr.postcommit.run()
+
+    def test_exchange_sync_scheduled(self):
+        self._run_postcommit()
+        self.env["ir.cron.trigger"].search([]).unlink()
+        self._get_sync_requests().unlink()
+        vals = {"model": self.partner._name, "res_id": self.partner.id}
+        self.backend.create_records("test_csv_output", [vals, vals])
+        self.backend.create_record("test_csv_output", vals)
+        # Not triggered by flushes (eg: savepoints)
+        self.env.cr.precommit.run()
+        self.assertFalse(self._get_sync_triggers("output"))
+        self._run_postcommit()
+        # Coalesced in one trigger
+        trigger = self._get_sync_triggers("output")
+        self.assertEqual(len(trigger), 1)
+        self.assertAlmostEqual(
+            trigger.call_at,
+            fields.Datetime.now() + timedelta(seconds=10),
+            delta=timedelta(seconds=5),
+        )
+        self.assertFalse(self._get_sync_triggers("input"))
+        self.assertRecordValues(
+            self._get_sync_requests(),
+            [{"backend_id": self.backend.id, "direction": "output"}],
+        )
+        # Next changes within the delay are handled by the same trigger
+        self.backend.create_record("test_csv_output", vals)
+        self._run_postcommit()
+        self.assertEqual(self._get_sync_triggers("output"), trigger)
+        self.assertEqual(len(self._get_sync_requests()), 2)
+        # Scheduling disabled
+        trigger.unlink()
+        self._get_sync_requests().unlink()
+        self.backend.sync_trigger_delay = 0
+        self.backend.create_record("test_csv_output", vals)
+        self._run_postcommit()
+        self.assertFalse(self._get_sync_triggers("output"))
+        self.assertFalse(self._get_sync_requests())
+
+    @mute_logger(*LOGGERS)
+    def test_exchange_sync_requested(self):
+        self.exchange_type_out.exchange_file_auto_generate = True
+        self.backend.copy()
+        self.record2.edi_exchange_state = "output_sent_and_error"
+        self.env["edi.backend.sync.request"]._add(
+            [(self.backend.id, "output"), (self.backend.id, "input")]
+        )
+        backend_cls = type(self.backend)
+        with mock.patch.object(
+            backend_cls,
+            "_check_exchange_sync_chunked",
+            autospec=True,
+            side_effect=backend_cls._check_exchange_sync_chunked,
+        ) as mocked:
+            self.env["edi.backend"]._cron_check_requested_exchange_sync("output")
+        # Requested backends only, records waiting for an action only
+        self.assertEqual([x.args[0] for x in mocked.call_args_list], [self.backend])
+        for rec in self.record1 + self.record3:
+            self.assertEqual(rec.edi_exchange_state, "output_sent")
+        self.assertTrue(FakeOutputChecker.check_not_called_for(self.record2))
+        self.assertEqual(self.record2.edi_exchange_state, "output_sent_and_error")
+        # Requests of other directions are kept
+        self.assertRecordValues(
+            self._get_sync_requests(),
+            [{"backend_id": self.backend.id, "direction": "input"}],
+        )
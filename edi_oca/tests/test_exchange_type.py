@@ -3,8 +3,12 @@
 # @author: Simone Orsi <simahawk@gmail.com>
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 
+from unittest import mock
+
+import yaml
 from freezegun import freeze_time
 
+from odoo import exceptions
 from odoo.tools import mute_logger
 
 from .common import EDIBackendCommonTestCase
@@ -67,6 +71,55 @@ class EDIExchangeTypeTestCase(EDIBackendCommonTestCase):
         })
         # fmt:on
 
+    def test_advanced_settings_cached(self):
+        settings = """
+        components:
+            generate:
+                usage: my.special.generate
+        """
+        self.exchange_type_out.advanced_settings_edit = settings
+        self.exchange_type_in.advanced_settings_edit = settings
+        self.env.registry.clear_cache()
+        with mock.patch(
+            "odoo.addons.edi_oca.models.edi_exchange_type.yaml.load",
+            side_effect=yaml.load,
+        ) as mocked:
+            for __ in range(3):
+                self.assertEqual(
+                    self.exchange_type_out.get_settings(),
+                    {"components": {"generate": {"usage": "my.special.generate"}}},
+                )
+                self.assertEqual(
+                    self.exchange_type_in.get_settings(),
+                    self.exchange_type_out.get_settings(),
+                )
+            self.assertEqual(mocked.call_count, 1)
+        # Settings can be modified w/o altering the cache
+        self.exchange_type_out.get_settings()["components"]["generate"]["usage"] = "x"
+        self.assertEqual(
+            self.exchange_type_in.get_settings(),
+            {"components": {"generate": {"usage": "my.special.generate"}}},
+        )
+
+    def test_advanced_settings_validation(self):
+        with self.assertRaisesRegex(exceptions.ValidationError, "not valid YAML"):
+            self.exchange_type_out.advanced_settings_edit = "components: [foo"
+        with self.assertRaisesRegex(exceptions.ValidationError, "dictionary"):
+            self.exchange_type_out.advanced_settings_edit = "- foo"
+        with self.assertRaisesRegex(exceptions.ValidationError, "components.send"):
+            self.exchange_type_out.advanced_settings_edit = """
+            components:
+                send: my.usage
+            """
+        with self.assertRaisesRegex(
+            exceptions.ValidationError, "components.send.env_ctx"
+        ):
+            self.exchange_type_out.advanced_settings_edit = """
+            components:
+                send:
+                    env_ctx: foo
+            """
+
     def _test_exchange_filename(self, wanted_filename):
         filename = self.exchange_type_out._make_exchange_filename(
             exchange_record=self.env["edi.exchange.record"]
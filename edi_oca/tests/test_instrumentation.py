@@ -0,0 +1,108 @@
+# Copyright 2026 Camptocamp SA
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+from unittest import mock
+
+from odoo.addons.edi_oca import instrumentation
+
+from .common import EDIBackendCommonComponentRegistryTestCase
+from .fake_components import FakeOutputGenerator, FakeOutputSender
+
+
+class EDIInstrumentationTestCase(EDIBackendCommonComponentRegistryTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._build_components(cls, FakeOutputGenerator, FakeOutputSender)
+        cls.record = cls.backend.create_record(
+            "test_csv_output", {"model": cls.partner._name, "res_id": cls.partner.id}
+        )
+
+    def setUp(self):
+        super().setUp()
+        instrumentation.recorder.pop()
+
+    def test_disabled(self):
+        self.record.action_exchange_generate()
+        self.assertFalse(instrumentation.recorder.pop())
+
+    @mock.patch.object(instrumentation, "enabled", True)
+    def test_measure(self):
+        self.record.action_exchange_generate()
+        self.record.action_exchange_send()
+        stats = instrumentation.recorder.pop()
+        prefix = ("demo_backend", "test_csv_output")
+        for action, phase in (
+            ("generate", "lookup"),
+            ("generate", "call"),
+            ("generate", "encode"),
+            ("generate", "write"),
+            ("generate", "notify"),
+            ("send", "lookup"),
+            ("send", "call"),
+            ("send", "write"),
+            ("send", "notify"),
+        ):
+            stat = stats[prefix + (action, phase)]
+            self.assertEqual(stat.count, 1)
+            self.assertEqual(sum(stat.buckets), 1)
+            self.assertGreaterEqual(stat.wall_time, 0)
+        self.assertTrue(stats[prefix + ("send", "write")].queries)
+        metric_model = self.env["edi.backend.metric"]
+        metric_model._store(stats)
+        metric_model._store(stats)
+        text = metric_model._prometheus_text()
+        labels = (
+            'backend_type="demo_backend",exchange_type="test_csv_output",'
+            'action="send",phase="call"'
+        )
+        self.assertIn(
+            f'edi_action_duration_seconds_bucket{{{labels},le="+Inf"}} 2', text
+        )
+        self.assertIn(f"edi_action_duration_seconds_count{{{labels}}} 2", text)
+        self.assertIn(f"edi_action_queries_total{{{labels}}}", text)
+
+    @mock.patch.object(instrumentation, "enabled", True)
+    @mock.patch.object(instrumentation, "FLUSH_INTERVAL", -1)
+    def test_flush(self):
+        metric_model = self.env["edi.backend.metric"]
+        self.assertFalse(metric_model.search([]))
+        self.record.action_exchange_generate()
+        metrics = metric_model.search([])
+        self.assertIn("generate", metrics.mapped("action"))
+        self.assertFalse(instrumentation.recorder.pop())
+
+    @mock.patch.object(instrumentation, "enabled", True)
+    def test_gc_keeps_totals(self):
+        self.record.action_exchange_generate()
+        stats = instrumentation.recorder.pop()
+        metric_model = self.env["edi.backend.metric"]
+        metric_model._store(stats)
+        metric_model._store(stats)
+        labels = (
+            'backend_type="demo_backend",exchange_type="test_csv_output",'
+            'action="generate",phase="call"'
+        )
+        count_line = f"edi_action_duration_seconds_count{{{labels}}} 2"
+        text = metric_model._prometheus_text()
+        self.assertIn(count_line, text)
+        # Removed metrics are summed up: counters do not decrease
+        metric_model.search([]).write({"date": "2000-01-01"})
+        metric_model._gc_metrics()
+        self.assertFalse(metric_model.search([]))
+        total_model = self.env["edi.backend.metric.total"]
+        self.assertTrue(total_model.search([]))
+        self.assertEqual(metric_model._prometheus_text(), text)
+        # New metrics add up to the totals
+        metric_model._store(stats)
+        self.assertIn(
+            f"edi_action_duration_seconds_count{{{labels}}} 3",
+            metric_model._prometheus_text(),
+        )
+        metric_model.search([]).write({"date": "2000-01-01"})
+        metric_model._gc_metrics()
+        self.assertEqual(len(total_model.search([])), len(stats))
+        self.assertIn(
+            f"edi_action_duration_seconds_count{{{labels}}} 3",
+            metric_model._prometheus_text(),
+        )
@@ -74,6 +74,75 @@ class EDIQuickExecTestCase(EDIBackendCommonComponentRegistryTestCase):
             record0._get_file_content(), FakeOutputGenerator._call_key(record0)
         )
 
+    def test_quick_exec_on_create_records(self):
+        self.exchange_type_out.exchange_file_auto_generate = True
+        self.exchange_type_out.quick_exec = True
+        vals_list = [
+            {"model": self.partner._name, "res_id": partner.id}
+            for partner in (self.partner, self.partner2, self.partner3)
+        ]
+        backend_cls = type(self.backend)
+        with mock.patch.object(
+            backend_cls,
+            "_check_output_exchange_sync",
+            autospec=True,
+            side_effect=backend_cls._check_output_exchange_sync,
+        ) as mocked:
+            records = self.backend.create_records("test_csv_output", vals_list)
+        # All records handled at once
+        self.assertEqual(mocked.call_count, 1)
+        for record in records:
+            self.assertEqual(record.edi_exchange_state, "output_sent")
+            self.assertTrue(FakeOutputGenerator.check_called_for(record))
+
+    def test_quick_exec_on_create_batch(self):
+        self.exchange_type_out.exchange_file_auto_generate = True
+        self.exchange_type_out.quick_exec = True
+        self.exchange_type_in.quick_exec = True
+        vals_list = [
+            {"model": self.partner._name, "res_id": partner.id}
+            for partner in (self.partner, self.partner2)
+        ]
+        vals_list_out = self.backend._create_records_prepare_values(
+            self.exchange_type_out, vals_list
+        )
+        vals_list_in = self.backend._create_records_prepare_values(
+            self.exchange_type_in,
+            [
+                dict(
+                    vals,
+                    exchange_file=base64.b64encode(b"1234"),
+                    edi_exchange_state="input_received",
+                )
+                for vals in vals_list
+            ],
+        )
+        backend_cls = type(self.backend)
+        with (
+            mock.patch.object(
+                backend_cls,
+                "_check_output_exchange_sync",
+                autospec=True,
+                side_effect=backend_cls._check_output_exchange_sync,
+            ) as mocked_out,
+            mock.patch.object(
+                backend_cls,
+                "_check_input_exchange_sync",
+                autospec=True,
+                side_effect=backend_cls._check_input_exchange_sync,
+            ) as mocked_in,
+        ):
+            records = self.env["edi.exchange.record"].create(
+                vals_list_out + vals_list_in
+            )
+        # One sync per backend and direction
+        self.assertEqual(mocked_out.call_count, 1)
+        self.assertEqual(mocked_in.call_count, 1)
+        self.assertEqual(
+            records.mapped("edi_exchange_state"),
+            ["output_sent", "output_sent", "input_processed", "input_processed"],
+        )
+
     def test_quick_exec_on_create_in(self):
         self.exchange_type_in.quick_exec = True
         vals = {
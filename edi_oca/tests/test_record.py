@@ -4,6 +4,7 @@
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 
 import base64
+import contextlib
 from unittest import mock
 
 from freezegun import freeze_time
@@ -35,6 +36,31 @@ class EDIRecordTestCase(EDIBackendCommonTestCase):
         )
         self.assertNotEqual(new_record.identifier, record.identifier)
 
+    def _test_identifier_allocation(self, mode):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "edi_oca.identifier_allocation", mode
+        )
+        vals = {
+            "model": self.partner._name,
+            "res_id": self.partner.id,
+        }
+        records = self.backend.create_records("test_csv_output", [vals] * 3)
+        record = self.backend.create_record("test_csv_output", vals)
+        identifiers = (records + record).mapped("identifier")
+        self.assertEqual(len(set(identifiers)), 4)
+        for identifier in identifiers:
+            self.assertRegex(identifier, rf"^EDI/{fields.Date.today().year}/\d{{10}}$")
+        # The sequence is still in charge of numbers
+        identifier = self.env["ir.sequence"].next_by_code("edi.exchange")
+        self.assertNotIn(identifier, identifiers)
+        self.assertGreater(identifier, max(identifiers))
+
+    def test_record_identifier_batch(self):
+        self._test_identifier_allocation("batch")
+
+    def test_record_identifier_block(self):
+        self._test_identifier_allocation("block")
+
     def test_record_validate_state(self):
         expected_err = "Exchange state must respect direction!"
         with self.assertRaises(exceptions.ValidationError, msg=expected_err):
@@ -101,6 +127,42 @@ class EDIRecordTestCase(EDIBackendCommonTestCase):
         self.assertFalse(record1.record)
         self.assertFalse(record1.related_name)
 
+    @mute_logger("odoo.models.unlink")
+    def test_related_records_batch(self):
+        partners = self.env["res.partner"].create(
+            [{"name": f"EDI partner {i}"} for i in range(4)]
+        )
+        records = self.backend.create_records(
+            "test_csv_output",
+            [{"model": partner._name, "res_id": partner.id} for partner in partners],
+        )
+        child = self.backend.create_record(
+            "test_csv_output_ack", {"parent_id": records[0].id}
+        )
+        partners[-1].unlink()
+
+        def count_queries(recs):
+            recs.invalidate_recordset()
+            partners.invalidate_recordset()
+            queries = self.env.cr.sql_log_count
+            recs.mapped("related_name")
+            recs.mapped("related_record_exists")
+            recs.mapped("display_name")
+            return self.env.cr.sql_log_count - queries
+
+        # Same queries whatever the number of records
+        self.assertEqual(
+            count_queries(records[:1] | records[-1]), count_queries(records | child)
+        )
+        self.assertEqual(
+            (records | child).mapped("related_name"),
+            [partner.name for partner in partners[:3]] + ["", partners[0].name],
+        )
+        self.assertEqual(
+            (records | child).mapped("related_record_exists"),
+            [True, True, True, False, True],
+        )
+
     def test_record_empty_with_parent(self):
         """Simulate child record doesn't have a model and res_id.
 
@@ -202,6 +264,23 @@ class EDIRecordTestCase(EDIBackendCommonTestCase):
         ack2 = record0.exchange_create_ack_record()
         self.assertEqual(record0.ack_exchange_id, ack2)
 
+    def test_create_ack_batch(self):
+        records = self._create_output_pending_records(3)
+        self.assertEqual(records.mapped("ack_expected"), [True, True, True])
+        vals = {"model": self.partner._name, "res_id": self.partner.id}
+        acks = self.backend.create_records(
+            "test_csv_output_ack",
+            [dict(vals, parent_id=rec.id) for rec in records[:2]] * 2,
+        )
+        # Not an ACK
+        self.backend.create_record(
+            "test_csv_output", dict(vals, parent_id=records[2].id)
+        )
+        self.assertEqual(records[0].ack_exchange_id, acks[2])
+        self.assertEqual(records[1].ack_exchange_id, acks[3])
+        self.assertFalse(records[2].ack_exchange_id)
+        self.assertEqual(acks.mapped("ack_expected"), [False] * 4)
+
     def test_retry(self):
         vals = {
             "model": self.partner._name,
@@ -220,7 +299,8 @@ class EDIRecordTestCase(EDIBackendCommonTestCase):
 
     def test_checksum(self):
         filecontent = base64.b64encode(b"ABC")
-        checksum1 = get_checksum(filecontent)
+        # Checksum of the raw content
+        checksum1 = get_checksum(b"ABC")
         vals = {
             "model": self.partner._name,
             "res_id": self.partner.id,
@@ -229,7 +309,218 @@ class EDIRecordTestCase(EDIBackendCommonTestCase):
         record0 = self.backend.create_record("test_csv_output", vals)
         self.assertEqual(record0.exchange_filechecksum, checksum1)
         filecontent = base64.b64encode(b"DEF")
-        checksum2 = get_checksum(filecontent)
+        checksum2 = get_checksum(b"DEF")
         record0.exchange_file = filecontent
         self.assertEqual(record0.exchange_filechecksum, checksum2)
         self.assertNotEqual(record0.exchange_filechecksum, checksum1)
+        record0.exchange_file = False
+        self.assertFalse(record0.exchange_filechecksum)
+
+    def test_file_raw(self):
+        vals = {"model": self.partner._name, "res_id": self.partner.id}
+        record = self.backend.create_record("test_csv_output", vals)
+        self.assertEqual(record._get_file_raw(), b"")
+        with record._open_file() as content:
+            self.assertEqual(bytes(content), b"")
+        record._set_file_raw(b"ABC")
+        self.assertEqual(record._get_file_raw(), b"ABC")
+        self.assertEqual(record.exchange_file, base64.b64encode(b"ABC"))
+        self.assertTrue(record.has_file)
+        self.assertEqual(record.exchange_filechecksum, get_checksum(b"ABC"))
+        with record._open_file() as content:
+            self.assertEqual(bytes(content[1:]), b"BC")
+        record._set_file_raw(b"DEF")
+        self.assertEqual(record._get_file_content(), "DEF")
+        self.assertEqual(record.exchange_filechecksum, get_checksum(b"DEF"))
+        record._set_file_raw(b"")
+        self.assertFalse(record.exchange_file)
+        self.assertFalse(record.has_file)
+
+    def test_has_file(self):
+        vals = {
+            "model": self.partner._name,
+            "res_id": self.partner.id,
+        }
+        record0 = self.backend.create_record("test_csv_output", vals)
+        self.assertEqual(record0.direction, "output")
+        self.assertFalse(record0.has_file)
+        domain = [("id", "=", record0.id), ("has_file", "=", False)]
+        self.assertEqual(self.env["edi.exchange.record"].search(domain), record0)
+        record0._set_file_content("ABC")
+        self.assertTrue(record0.has_file)
+        self.assertFalse(self.env["edi.exchange.record"].search(domain))
+        record0.exchange_file = False
+        self.assertFalse(record0.has_file)
+
+    def _create_output_pending_records(self, count):
+        vals = {
+            "model": self.partner._name,
+            "res_id": self.partner.id,
+            "edi_exchange_state": "output_pending",
+        }
+        return self.backend.create_records("test_csv_output", [vals] * count)
+
+    def _test_state_transition(self, records):
+        with freeze_time("2024-01-01 10:00:00"):
+            self.backend.exchange_records_transition(
+                [
+                    (records[0], "output_sent", None),
+                    (records[1], "output_sent", None),
+                    (records[2], "output_error_on_send", "Boom"),
+                ]
+            )
+        self.assertRecordValues(
+            records,
+            [
+                {"edi_exchange_state": "output_sent", "exchange_error": False},
+                {"edi_exchange_state": "output_sent", "exchange_error": False},
+                {
+                    "edi_exchange_state": "output_error_on_send",
+                    "exchange_error": "Boom",
+                },
+            ],
+        )
+        for rec in records:
+            self.assertEqual(
+                fields.Datetime.to_string(rec.exchanged_on), "2024-01-01 10:00:00"
+            )
+        # Dependent fields are up to date
+        self.assertEqual(records.mapped("retryable"), [False, False, True])
+        with self.assertRaisesRegex(exceptions.UserError, "output_sent -> new"):
+            self.backend.exchange_records_transition([(records[0], "new", None)])
+
+    def test_state_transition(self):
+        self._test_state_transition(self._create_output_pending_records(3))
+
+    def test_state_transition_bulk(self):
+        self.exchange_type_out.bulk_state_update = True
+        records = self._create_output_pending_records(3)
+        record_model = type(self.env["edi.exchange.record"])
+        with mock.patch.object(record_model, "write") as mocked:
+            self._test_state_transition(records)
+            mocked.assert_not_called()
+
+    def test_state_transition_not_strict(self):
+        records = self._create_output_pending_records(1)
+        logger_name = "odoo.addons.edi_oca.models.edi_backend"
+        with self.assertLogs(logger_name, "WARNING") as watcher:
+            self.backend.exchange_records_transition(
+                [(records, "new", None)], strict=False
+            )
+        self.assertIn("output_pending -> new", watcher.output[0])
+        self.assertEqual(records.edi_exchange_state, "new")
+
+    def test_state_transition_bulk_direction(self):
+        records = self._create_output_pending_records(1)
+        with self.assertRaises(exceptions.ValidationError):
+            records._write_state_values({"edi_exchange_state": "input_received"})
+
+    def test_state_transition_log(self):
+        self.backend.log_transitions = True
+        records = self._create_output_pending_records(2)
+        self.backend.exchange_records_transition(
+            [(records[0], "output_sent", None), (records[1], "output_pending", None)],
+            action_duration=1.5,
+        )
+        # No change for the 2nd record: nothing to log
+        log = self.env["edi.exchange.record.transition"].search(
+            [("record_id", "in", records.ids)]
+        )
+        self.assertRecordValues(
+            log,
+            [
+                {
+                    "record_id": records[0].id,
+                    "backend_id": self.backend.id,
+                    "type_id": self.exchange_type_out.id,
+                    "from_state": "output_pending",
+                    "to_state": "output_sent",
+                    "action_duration": 1.5,
+                }
+            ],
+        )
+        self.assertGreaterEqual(log.duration, 0)
+        self.assertTrue(log.worker)
+        self.backend.exchange_records_transition(
+            [(records[0], "output_sent_and_processed", None)]
+        )
+        # State changes out of the transition service are logged as well
+        records[1].edi_exchange_state = "output_error_on_send"
+        log = self.env["edi.exchange.record.transition"].search(
+            [("record_id", "=", records[1].id)]
+        )
+        self.assertRecordValues(
+            log,
+            [
+                {
+                    "from_state": "output_pending",
+                    "to_state": "output_error_on_send",
+                    "action_duration": 0,
+                }
+            ],
+        )
+        stats = self.env["edi.exchange.record.transition.stats"].search(
+            [("type_id", "=", self.exchange_type_out.id)]
+        )
+        self.assertEqual(
+            sorted(stats.mapped("to_state")),
+            ["output_error_on_send", "output_sent", "output_sent_and_processed"],
+        )
+
+    def test_state_transition_error(self):
+        records = self._create_output_pending_records(3)
+        traceback = (
+            "Traceback (most recent call last):\n"
+            '  File "/odoo/addons/edi_oca/models/edi_backend.py", line %d, in send\n'
+            "    raise ValueError(msg)\n"
+            "ValueError: Record %d not found\n"
+        )
+        self.backend.exchange_records_transition(
+            [
+                (records[0], "output_error_on_send", traceback % (10, 1)),
+                (records[1], "output_error_on_send", traceback % (12, 2)),
+                (records[2], "output_error_on_send", "Boom"),
+            ]
+        )
+        errors = records.error_id
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(records[0].error_id, records[1].error_id)
+        self.assertRecordValues(
+            records,
+            [
+                {"exchange_error": "ValueError: Record 1 not found"},
+                {"exchange_error": "ValueError: Record 2 not found"},
+                {"exchange_error": "Boom"},
+            ],
+        )
+        self.assertRecordValues(
+            records[:2].error_id,
+            [
+                {
+                    "name": "ValueError: Record 1 not found",
+                    "traceback": traceback % (10, 1),
+                    "count": 2,
+                }
+            ],
+        )
+        # Same error again: linked to the existing error,
+        # occurrences are counted once committed
+        new_record = self._create_output_pending_records(1)
+        self.backend.exchange_records_transition(
+            [(new_record, "output_error_on_send", "Boom")]
+        )
+        self.assertEqual(new_record.error_id, records[2].error_id)
+        self.assertEqual(new_record.error_id.count, 1)
+        # Counters are updated from a new cursor, use the test one instead
+        with mock.patch.object(
+            type(self.env.registry),
+            "cursor",
+            return_value=contextlib.nullcontext(self.env.cr),
+        ):
+            self.env.cr.postcommit.run()
+        new_record.error_id.invalidate_recordset(["count"])
+        self.assertEqual(new_record.error_id.count, 2)
+        # Error values are reset w/ the state
+        self.backend.exchange_records_transition([(new_record, "output_pending", None)])
+        self.assertFalse(new_record.error_id)
+        self.assertFalse(new_record.exchange_error)
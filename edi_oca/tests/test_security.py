@@ -2,6 +2,9 @@
 # @author: Enric Tobella
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 
+import contextlib
+from unittest import mock
+
 from odoo_test_helper import FakeModelLoader
 
 from odoo.exceptions import AccessError
@@ -117,6 +120,60 @@ class TestEDIExchangeRecordSecurity(EDIBackendCommonTestCase):
         ):
             exchange_record.with_user(self.user).read()
 
+    def test_check_access_batch(self):
+        exchange_records = self.create_record() | self.create_record()
+        other_record = self.consumer_record.copy()
+        exchange_records |= self.backend.create_record(
+            "test_csv_output",
+            {"model": other_record._name, "res_id": other_record.id},
+        )
+        self.user.write({"groups_id": [(4, self.group.id)]})
+        consumer_model = type(self.consumer_record)
+        with mock.patch.object(
+            consumer_model, "get_edi_access", autospec=True, return_value="read"
+        ) as mocked:
+            exchange_records.with_user(self.user).check_access("read")
+        # Access policy is retrieved once for all related documents
+        mocked.assert_called_once()
+        self.assertEqual(
+            sorted(mocked.call_args.args[1]),
+            sorted((self.consumer_record | other_record).ids),
+        )
+
+    @mute_logger("odoo.addons.base.models.ir_rule")
+    def test_check_access_cache(self):
+        exchange_record = self.create_record().with_user(self.user)
+        self.user.write({"groups_id": [(4, self.group.id)]})
+        consumer_model = type(self.consumer_record)
+        with mock.patch.object(
+            consumer_model, "get_edi_access", autospec=True, return_value="read"
+        ) as mocked:
+            exchange_record.check_access("read")
+            exchange_record.check_access("read")
+            mocked.assert_called_once()
+            # Flushing savepoints keep cached decisions...
+            with self.env.cr.savepoint():
+                exchange_record.check_access("read")
+            exchange_record.check_access("read")
+            mocked.assert_called_once()
+            # ...rolled back ones drop them
+            with contextlib.suppress(ValueError), self.env.cr.savepoint():
+                exchange_record.check_access("read")
+                raise ValueError()
+            exchange_record.check_access("read")
+            self.assertEqual(mocked.call_count, 2)
+            # Cached decisions are dropped when the related document changes
+            self.consumer_record.name = "no_rule"
+            with self.assertRaises(AccessError):
+                exchange_record.check_access("read")
+            self.assertEqual(mocked.call_count, 3)
+        self.consumer_record.name = "test"
+        exchange_record.check_access("read")
+        # ...and when record rules change
+        self.rule.domain_force = "[('name', '=', 'other')]"
+        with self.assertRaises(AccessError):
+            exchange_record.check_access("read")
+
     @mute_logger("odoo.addons.base.models.ir_model")
     def test_no_group_no_unlink(self):
         exchange_record = self.create_record()
@@ -173,20 +230,12 @@ class TestEDIExchangeRecordSecurity(EDIBackendCommonTestCase):
         exchange_record = self.create_record()
         exchange_record.res_id = -1
         self.user.write({"groups_id": [(4, self.group.id)]})
-        logger_name = "odoo.addons.edi_oca.models.edi_exchange_record"
-        expected_msg = (
-            f"WARNING:{logger_name}:"
-            f"Deleted record {exchange_record.model},{exchange_record.res_id} "
-            f"is referenced by edi.exchange.record [{exchange_record.id}]"
-        )
-        with self.assertLogs(logger_name, "WARNING") as watcher:
-            self.assertEqual(
-                0,
-                self.env["edi.exchange.record"]
-                .with_user(self.user)
-                .search_count([("id", "=", exchange_record.id)]),
-            )
-            self.assertEqual(watcher.output, [expected_msg])
+        self.assertEqual(
+            0,
+            self.env["edi.exchange.record"]
+            .with_user(self.user)
+            .search_count([("id", "=", exchange_record.id)]),
+        )
 
     def test_search_no_record_admin(self):
         # Consumer record no longer exists:
@@ -195,14 +244,53 @@ class TestEDIExchangeRecordSecurity(EDIBackendCommonTestCase):
         exchange_record.res_id = -1
         admin_group = self.env.ref("base.group_system")
         self.user.write({"groups_id": [(4, self.group.id), (4, admin_group.id)]})
-        logger_name = "odoo.addons.edi_oca.models.edi_exchange_record"
-        with self.assertLogs(logger_name, "WARNING"):
-            self.assertEqual(
-                1,
-                self.env["edi.exchange.record"]
-                .with_user(self.user)
-                .search_count([("id", "=", exchange_record.id)]),
-            )
+        self.assertEqual(
+            1,
+            self.env["edi.exchange.record"]
+            .with_user(self.user)
+            .search_count([("id", "=", exchange_record.id)]),
+        )
+
+    def test_search_limit(self):
+        # Access is checked in SQL: limit and offset apply on allowed records
+        self.user.write({"groups_id": [(4, self.group.id)]})
+        hidden_record = self.env["edi.exchange.consumer.test"].create(
+            {"name": "no_rule"}
+        )
+        allowed = self.create_record() | self.create_record()
+        hidden = self.backend.create_record(
+            "test_csv_output",
+            {"model": hidden_record._name, "res_id": hidden_record.id},
+        )
+        domain = [("id", "in", (allowed | hidden).ids)]
+        model = self.env["edi.exchange.record"].with_user(self.user)
+        self.assertEqual(model.search(domain, order="id desc", limit=1), allowed[1])
+        self.assertEqual(
+            model.search(domain, order="id desc", limit=1, offset=1), allowed[0]
+        )
+        self.assertEqual(model.search_count(domain), 2)
+
+    def test_search_related_exchange_record(self):
+        # Exchanges about exchanges follow the access to the related exchange
+        self.user.write({"groups_id": [(4, self.group.id)]})
+        hidden_record = self.env["edi.exchange.consumer.test"].create(
+            {"name": "no_rule"}
+        )
+        allowed = self.create_record()
+        hidden = self.backend.create_record(
+            "test_csv_output",
+            {"model": hidden_record._name, "res_id": hidden_record.id},
+        )
+        meta_records = self.backend.create_records(
+            "test_csv_output",
+            [
+                {"model": allowed._name, "res_id": allowed.id},
+                {"model": hidden._name, "res_id": hidden.id},
+            ],
+        )
+        domain = [("id", "in", (allowed | hidden | meta_records).ids)]
+        model = self.env["edi.exchange.record"].with_user(self.user)
+        self.assertEqual(model.search(domain), allowed | meta_records[0])
 
     @mute_logger("odoo.addons.base.models.ir_model")
     def test_no_group_no_write(self):
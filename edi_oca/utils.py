@@ -3,9 +3,21 @@
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 
 import hashlib
+import os
+import socket
 
 from odoo.addons.queue_job.job import identity_exact_hasher
 
+_HOSTNAME = socket.gethostname()
+
+
+def get_worker():
+    """Identify current worker in logs and metrics.
+
+    Not computed at import: prefork workers are forked after modules are loaded.
+    """
+    return f"{_HOSTNAME}:{os.getpid()}"
+
 
 def normalize_string(cls, a_string, sep="_"):
     """Normalize given string, replace dashes with given separator."""
@@ -13,7 +25,8 @@ def normalize_string(cls, a_string, sep="_"):
 
 
 def get_checksum(filecontent):
-    return hashlib.md5(filecontent).hexdigest()
+    """SHA1 of given raw file content, as computed by `ir.attachment`."""
+    return hashlib.sha1(filecontent).hexdigest()
 
 
 def exchange_record_job_identity_exact(job_):